@@ -1,20 +1,30 @@
 # coding=utf-8
 import logging
 import time
-import json
-from functools import wraps
+from datetime import datetime
 from collections import namedtuple
-from concurrent.futures import ThreadPoolExecutor
-from typing import Union, Callable
+from typing import Union, Callable, Mapping
 
-from requests import post
 from flask import (
     Flask, Blueprint, current_app,
-    request, jsonify, abort,
+    request, jsonify, abort, has_request_context,
 )
-from werkzeug.exceptions import HTTPException
 
-from .message import Attachment, PrivateResponse, IndirectResponse
+from .transport import post, LazyExecutor
+from .message import (
+    Attachment, PrivateResponse, IndirectResponse, DelayedResponse
+)
+from .directory import Directory
+from .events import EventQueue
+from .limits import admission, parse_limit, DEFAULT_LIMIT_MESSAGE
+from .budget import (
+    TimeBudget, DEFAULT_DEFERRED_MESSAGE, DEFAULT_DEFERRED_ERROR_MESSAGE
+)
+from .scheduler import Scheduler
+from .updater import MessageUpdater, closing_updater
+from .pipeline import (
+    compile_view, compile_handler, form_data, json_payload, json_body
+)
 from .exceptions import ConfigError
 
 __all__ = ["Flack", ]
@@ -23,18 +33,48 @@ logger = logging.getLogger(__name__)
 
 SLACK_TRIGGER = namedtuple("trigger", ("callback", "user"))
 
-CALLER = namedtuple("caller", ("id", "name", "team"))
-CHANNEL = namedtuple("channel", ("id", "name", "team"))
 
-thread_executor = ThreadPoolExecutor(1)
+def _directory() -> Directory:
+    instances = current_app.extensions["flack"]
+
+    # Prefer the instance whose blueprint is handling the request
+    name = request.blueprint if has_request_context() else None
+    flack = instances.get(name) or next(iter(instances.values()))
+
+    directory = flack.directory
+    if directory is None:
+        raise ConfigError("A Slack API token is required")
+
+    return directory
+
+
+class CALLER(namedtuple("caller", ("id", "name", "team"))):
+    __slots__ = ()
+
+    @property
+    def info(self) -> Union[None, dict]:
+        """ Full user object, looked up through the cached directory """
+        return _directory().user(self.team, self.id)
+
 
+class CHANNEL(namedtuple("channel", ("id", "name", "team"))):
+    __slots__ = ()
 
-def _send_message(url: str, message: str) -> bool:
+    @property
+    def info(self) -> Union[None, dict]:
+        """ Full conversation object, looked up through the cached directory """
+        return _directory().channel(self.team, self.id)
+
+
+thread_executor = LazyExecutor(1)
+
+
+def _send_message(url: str, message: str, delay: float = 0.5) -> bool:
     """ Send a simple message """
-    logger.debug("Sending message to: {}, contents: {}".format(url, message))
+    logger.debug("Sending message to: %s, contents: %r", url, message)
 
     # This should prevent out-of-order issues, which slack really doesn't like
-    time.sleep(0.5)
+    time.sleep(delay)
     response = post(url, json=message)
 
     if response.status_code == 404:
@@ -45,136 +85,332 @@ def _send_message(url: str, message: str) -> bool:
         return True
 
 
-def get_form_data(fn: Callable) -> Callable:
-    """ Extracts a form-encded payload from request """
+class Flack:
+    directory = None
+    event_queue = None
+    scheduler = None
+    _token_loader = None
 
-    @wraps(fn)
-    def inner(*args, **kwargs):
-        data = request.form.to_dict()
-        kwargs["data"] = data
+    def __init__(
+        self,
+        app: Flask = None,
+        name: str = "slack_flask",
+        config: dict = None,
+    ) -> None:
+        self.name = name
+        self.config = {}
+        self._config_overrides = config or {}
+
+        self.triggers = {}
+        self.commands = {}
+        self.actions = {}
+        self.events = {}
+        self._updates = set()
+
+        self._before_hooks = []
+        self._after_hooks = []
+        self._error_hooks = []
 
-        return fn(*args, **kwargs)
+        if app is not None:
+            self.init_app(app)
 
-    return inner
+    def init_app(self, app: Flask) -> None:
+        """ Initialize and register blueprint """
 
+        self.app = app
 
-def get_json_data(fn: Callable) -> Callable:
-    """ Extracts a json payload from request """
+        self.app.config.setdefault("FLACK_TOKEN", "")
+        self.app.config.setdefault("FLACK_SIGNING_SECRET", "")
+        self.app.config.setdefault("FLACK_SIGNATURE_MAX_AGE", 300)
+        self.app.config.setdefault("FLACK_MAX_CONTENT_LENGTH", 1024 * 1024)
+        self.app.config.setdefault("FLACK_URL_PREFIX", "/flack")
+        self.app.config.setdefault("FLACK_DEFAULT_NAME", "flack")
+        self.app.config.setdefault("FLACK_API_TOKEN", "")
+        self.app.config.setdefault("FLACK_DIRECTORY_SIZE", 10000)
+        self.app.config.setdefault("FLACK_DIRECTORY_TTL", 3600)
+        self.app.config.setdefault("FLACK_LIMIT_MESSAGE", DEFAULT_LIMIT_MESSAGE)
+        self.app.config.setdefault("FLACK_DEFERRED_MESSAGE",
+                                   DEFAULT_DEFERRED_MESSAGE)
+        self.app.config.setdefault("FLACK_DEFERRED_ERROR_MESSAGE",
+                                   DEFAULT_DEFERRED_ERROR_MESSAGE)
+        self.app.config.setdefault("FLACK_HANDLER_WORKERS", 8)
+        self.app.config.setdefault("FLACK_EVENT_WORKERS", 4)
+        self.app.config.setdefault("FLACK_EVENT_BATCH_SIZE", 10)
+        self.app.config.setdefault("FLACK_EVENT_QUEUE_SIZE", 10000)
+        self.app.config.setdefault("FLACK_SCHEDULER_DB", None)
+        self.app.config.setdefault("FLACK_UPDATE_INTERVAL", 1.0)
+
+        # Resolved once, instance specific settings take precedence
+        self.config = {k: v for k, v in self.app.config.items()
+                       if k.startswith("FLACK_")}
+        self.config.update(self._config_overrides)
+
+        if self._token_loader or self.config["FLACK_API_TOKEN"]:
+            self._init_directory()
+
+        self.event_queue = EventQueue(
+            self._handle_event,
+            workers=self.config["FLACK_EVENT_WORKERS"],
+            batch_size=self.config["FLACK_EVENT_BATCH_SIZE"],
+            max_size=self.config["FLACK_EVENT_QUEUE_SIZE"])
+
+        self.handler_executor = LazyExecutor(
+            self.config["FLACK_HANDLER_WORKERS"])
+
+        self.scheduler = Scheduler(self._scheduled_response,
+                                   path=self.config["FLACK_SCHEDULER_DB"])
+
+        app.extensions.setdefault("flack", {})[self.name] = self
+
+        self._compile()
+
+        blueprint = Blueprint(self.name,
+                              __name__,
+                              template_folder="templates")
 
-    @wraps(fn)
-    def inner(*args, **kwargs):
-        data = json.loads(request.form["payload"])
-        kwargs["data"] = data
+        blueprint.add_url_rule("/webhook", methods=['POST'],
+                               view_func=self.dispatch_webhook)
+        blueprint.add_url_rule("/command", methods=['POST'],
+                               view_func=self.dispatch_command)
+        blueprint.add_url_rule("/action", methods=['POST'],
+                               view_func=self.dispatch_action)
+        blueprint.add_url_rule("/events", methods=['POST'],
+                               view_func=self.dispatch_event)
 
-        return fn(*args, **kwargs)
+        app.register_blueprint(blueprint,
+                               url_prefix=self.config["FLACK_URL_PREFIX"])
+
+        # Started by any request the process serves, never before a fork
+        app.before_request(self.scheduler.start)
+
+    def _compile(self) -> None:
+        """ Build the view functions from the current middleware """
+
+        def compile(kind, parse, run, respond):
+            return compile_view(self.config, kind, parse, run, respond,
+                                before=self._before_hooks,
+                                after=self._after_hooks,
+                                errors=self._error_hooks)
+
+        self.dispatch_webhook = compile(
+            "webhook", form_data, self._run_webhook, self._respond_webhook)
+        self.dispatch_command = compile(
+            "command", form_data, self._run_command, self._respond)
+        self.dispatch_action = compile(
+            "action", json_payload, self._run_action, self._respond)
+        self.dispatch_event = compile(
+            "events", json_body, self._run_event, self._respond_event)
+
+        # The same hooks, for transports other than HTTP (ie. Socket Mode)
+        self._handlers = {
+            kind: compile_handler(kind, run, lambda data, message: message,
+                                  before=self._before_hooks,
+                                  after=self._after_hooks,
+                                  errors=self._error_hooks)
+            for kind, run in (("command", self._run_command),
+                              ("action", self._run_action),
+                              ("events", self._run_event))
+        }
 
-    return inner
+        if "{}.webhook".format(self.name) in self.app.view_functions:
+            # Already registered, swap in the rebuilt views
+            for view in (self.dispatch_webhook, self.dispatch_command,
+                         self.dispatch_action, self.dispatch_event):
+                endpoint = "{}.{}".format(self.name, view.__name__)
+                self.app.view_functions[endpoint] = view
 
+    def _add_hook(self, hooks: list, fn: Callable) -> Callable:
+        hooks.append(fn)
 
-def validate_token(fn: Callable) -> Callable:
-    """ Validates payload tokens """
+        if getattr(self, "app", None):
+            self._compile()
 
-    @wraps(fn)
-    def inner(*args, **kwargs):
-        request_token = kwargs.get("data", {}).get("token")
-        flack_token = current_app.config["FLACK_TOKEN"]
+        return fn
 
-        if not flack_token:
-            raise ConfigError("A token must be defined")
+    def before_dispatch(self, fn: Callable) -> Callable:
+        """ Register a hook called with (kind, data) before each handler """
+        return self._add_hook(self._before_hooks, fn)
 
-        elif request_token != flack_token:
-            logger.error("Invalid Token")
-            abort(403)
+    def after_dispatch(self, fn: Callable) -> Callable:
+        """ Register a hook called with (kind, data, message) after each handler """
+        return self._add_hook(self._after_hooks, fn)
 
-        else:
-            return fn(*args, **kwargs)
+    def dispatch_error(self, fn: Callable) -> Callable:
+        """ Register a hook called with (kind, data, exception) on errors """
+        return self._add_hook(self._error_hooks, fn)
 
-    return inner
+    def _api_token(self, team: str) -> str:
+        """ Resolve the Web API token for a workspace """
 
+        if self._token_loader is not None:
+            return self._token_loader(team)
 
-def wrap_errors(fn: Callable) -> Callable:
-    """ Ensures exceptions are presented in a way slack understands """
+        return self.config["FLACK_API_TOKEN"]
 
-    @wraps(fn)
-    def inner(*args, **kwargs):
-        try:
-            return fn(*args, **kwargs)
+    def _init_directory(self) -> None:
+        self.directory = Directory(
+            self._api_token,
+            max_size=self.config["FLACK_DIRECTORY_SIZE"],
+            ttl=self.config["FLACK_DIRECTORY_TTL"])
 
-        except HTTPException:
-            # No need to alter an HTTP response
-            raise
+    def token_loader(self, fn: Callable) -> Callable:
+        """ Register a callback resolving a team id to its API token """
 
-        except Exception as e:
-            logger.exception("Caught: %r, coercing to HTTP 500.", e)
-            abort(500)
+        self._token_loader = fn
 
-    return inner
+        if self.directory is None and getattr(self, "app", None):
+            self._init_directory()
 
+        return fn
 
-class Flack:
-    triggers = {}
-    commands = {}
-    actions = {}
+    def _deferred_response(
+        self,
+        message,
+        url: str,
+        updater: MessageUpdater = None
+    ) -> None:
+        """ Deliver the late result of a handler to the response url """
 
-    def __init__(self, app: Flask = None) -> None:
-        if app is not None:
-            self.init_app(app)
+        if updater is not None:
+            # Sent as the final update, in the use of the url kept for it
+            updater.finish(message)
+            return
 
-    def init_app(self, app: Flask) -> None:
-        """ Initialize and register blueprint """
+        response = self._build_response(message, response_url=url)
+        if response is None:
+            return
 
-        self.app = app
+        logger.debug("Dispatching deferred response: %r to %s", response, url)
+        thread_executor.submit(_send_message, url, response)
 
-        self.app.config.setdefault("FLACK_TOKEN", "")
-        self.app.config.setdefault("FLACK_URL_PREFIX", "/flack")
-        self.app.config.setdefault("FLACK_DEFAULT_NAME", "flack")
+    def updater(
+        self,
+        response_url: str,
+        interval: float = None,
+        max_updates: int = 5,
+        reserved: int = 1
+    ) -> MessageUpdater:
+        """ Create an updater for the message behind a response url """
 
-        blueprint = Blueprint('slack_flask',
-                              __name__,
-                              template_folder="templates")
+        def build(message):
+            return self._build_response(message, response_url=response_url)
 
-        blueprint.add_url_rule("/webhook", methods=['POST'],
-                               view_func=self.dispatch_webhook)
-        blueprint.add_url_rule("/command", methods=['POST'],
-                               view_func=self.dispatch_command)
-        blueprint.add_url_rule("/action", methods=['POST'],
-                               view_func=self.dispatch_action)
+        def send(body):
+            _send_message(response_url, body, delay=0)
 
-        app.register_blueprint(blueprint,
-                               url_prefix=self.app.config["FLACK_URL_PREFIX"])
+        if interval is None:
+            interval = self.config["FLACK_UPDATE_INTERVAL"]
 
-    def _indirect_response(self, message: str, url: str) -> None:
-        """ Send the response to a separate endpoint """
+        return MessageUpdater(build, send, self.scheduler,
+                              interval=interval, max_updates=max_updates,
+                              reserved=reserved)
+
+    def _updater_kwargs(self, kind: str, name: str, response_url: str) -> dict:
+        if (kind, name) not in self._updates:
+            return {}
+
+        # A deferred result needs a use of the url of its own
+        registry = self.commands if kind == "command" else self.actions
+        reserved = 2 if isinstance(registry.get(name), TimeBudget) else 1
+
+        return {"updater": self.updater(response_url, reserved=reserved)}
+
+    def _call(self, kind: str, data: Mapping, callback: Callable, **kwargs):
+        """ Invoke a handler, honoring any time budget """
+
+        if isinstance(callback, TimeBudget):
+            response_url = data["response_url"]
+            updater = kwargs.get("updater")
+
+            return callback.run(
+                self.handler_executor,
+                lambda message: self._deferred_response(
+                    message, response_url, updater),
+                lambda e: self._deferred_error(kind, data, e, updater),
+                **kwargs)
+
+        return callback(**kwargs)
+
+    def _deferred_error(
+        self,
+        kind: str,
+        data: Mapping,
+        e: Exception,
+        updater: MessageUpdater = None
+    ) -> None:
+        """ Run the error hooks for a handler that failed after its budget """
+
+        with self.app.app_context():
+            for hook in self._error_hooks:
+                message = hook(kind, data, e)
+                if message is not None:
+                    break
+
+            else:
+                message = PrivateResponse(
+                    self.config["FLACK_DEFERRED_ERROR_MESSAGE"])
+
+            self._deferred_response(message, data["response_url"], updater)
+
+    def _indirect_body(self, indirect: Union[str, Attachment]) -> dict:
+        """ Generate the body of a response sent to a separate endpoint """
         indirect_response = {
             "text": "",
             "attachments": [],
             "response_type": "in_channel"
         }
 
-        _, indirect = message
-
         if isinstance(indirect, Attachment):
             indirect_response["attachments"].append(indirect.as_dict)
 
         else:
             indirect_response["text"] = indirect
 
+        return indirect_response
+
+    def _indirect_response(self, message: str, url: str) -> None:
+        """ Send the response to a separate endpoint """
+        _, indirect = message
+        indirect_response = self._indirect_body(indirect)
+
         logger.debug("Dispathing indirect response: %r to %s",
                      indirect_response, url)
         thread_executor.submit(_send_message, url, indirect_response)
 
-    def _response(
+    def _delayed_response(self, message: DelayedResponse, url: str) -> None:
+        """ Schedule the response to a separate endpoint """
+        indirect_response = self._indirect_body(message.indirect)
+
+        logger.debug("Scheduling delayed response: %r to %s in %ss",
+                     indirect_response, url, message.delay)
+        self.scheduler.schedule(time.time() + message.delay, url,
+                                indirect_response)
+
+    def _scheduled_response(self, url: str, message) -> None:
+        """ Post a scheduled job, callables are invoked when due """
+
+        if callable(message):
+            with self.app.app_context():
+                message = self._build_response(message(), response_url=url)
+
+            if message is None:
+                return
+
+        _send_message(url, message, delay=0)
+
+    def _build_response(
         self,
         message: Union[
-            None, str, IndirectResponse, PrivateResponse, Attachment
+            None, str, IndirectResponse, DelayedResponse,
+            PrivateResponse, Attachment
         ],
         response_url: str = None,
         user: str = None,
-    ) -> Union[str, dict]:
-        """ Generate the HTTP response to an incoming request from Slack """
+    ) -> Union[None, dict]:
+        """ Generate the response body for an incoming request from Slack """
 
         response = {
-            "username": user or self.app.config["FLACK_DEFAULT_NAME"],
+            "username": user or self.config["FLACK_DEFAULT_NAME"],
             "text": "",
             "attachments": [],
             "response_type": "in_channel",
@@ -183,21 +419,25 @@ class Flack:
 
         if message is None:
             # No feedback
-            return ""
+            return None
 
         elif isinstance(message, Attachment):
             response["attachments"].append(message.as_dict)
 
-        elif isinstance(message, IndirectResponse):
-            self._indirect_response(message, response_url)
+        elif isinstance(message, (IndirectResponse, DelayedResponse)):
+            if isinstance(message, DelayedResponse):
+                self._delayed_response(message, response_url)
+
+            else:
+                self._indirect_response(message, response_url)
 
             if not message.feedback:
                 # This suppresses any feedback.
-                return ""
+                return None
 
             elif message.feedback is True:
                 # This echoes the users input to the channel
-                return jsonify({"response_type": "in_channel"})
+                return {"response_type": "in_channel"}
 
             else:
                 response["text"] = message.feedback
@@ -211,28 +451,45 @@ class Flack:
             response["text"] = message
 
         logger.debug("Generated response: %r", response)
+        return response
+
+    def _response(
+        self,
+        message: Union[
+            None, str, IndirectResponse, DelayedResponse,
+            PrivateResponse, Attachment
+        ],
+        response_url: str = None,
+        user: str = None,
+    ) -> Union[str, dict]:
+        """ Generate the HTTP response to an incoming request from Slack """
+
+        response = self._build_response(message, response_url, user)
+        if response is None:
+            return ""
+
         return jsonify(response)
 
-    @get_form_data
-    @validate_token
-    @wrap_errors
-    def dispatch_webhook(self, data: dict) -> Union[str, dict]:
-        """ Parse and dispatch a webhook request """
+    def _respond(self, data: Mapping, message) -> Union[str, dict]:
+        return self._response(message, response_url=data["response_url"])
+
+    def _run_webhook(self, data: Mapping):
+        """ Run the handler for a webhook payload """
         try:
             prefix = len(data["trigger_word"])
-            data["text"] = data["text"][prefix:].strip()
-            callback, user = self.triggers[data["trigger_word"]]
+            text = data["text"][prefix:].strip()
+            callback, _ = self.triggers[data["trigger_word"]]
 
         except KeyError:
             logger.error("Unknown trigger: %s", data.get("trigger_word"))
             logger.error("Known triggers: %s", self.triggers.keys())
             abort(400)
 
-        logger.info("Running trigger: '{}' with: '{}'".format(
-            data["trigger_word"], data["text"]))
+        logger.info("Running trigger: '%s' with: '%s'",
+                    data["trigger_word"], text)
 
         response = callback(
-            text=data["text"],
+            text=text,
             user=CALLER(
                 data["user_id"],
                 data["user_name"],
@@ -240,13 +497,14 @@ class Flack:
             )
         )
 
-        return self._response(response, user=user)
+        return response
+
+    def _respond_webhook(self, data: Mapping, message) -> Union[str, dict]:
+        trigger = self.triggers.get(data["trigger_word"])
+        return self._response(message, user=trigger and trigger.user)
 
-    @get_form_data
-    @validate_token
-    @wrap_errors
-    def dispatch_command(self, data: dict) -> Union[str, dict]:
-        """ Parse and dispatch a command request """
+    def _run_command(self, data: Mapping):
+        """ Run the handler for a command payload """
         try:
             callback = self.commands[data["command"]]
 
@@ -254,10 +512,13 @@ class Flack:
             logger.error("Unknown command: %s", data.get("command"))
             abort(400)
 
-        logger.info("Running command: '{}' with: '{}'".format(
-            data["command"], data["text"]))
+        logger.info("Running command: '%s' with: '%s'",
+                    data["command"], data["text"])
 
-        response = callback(
+        response = self._call(
+            "command", data, callback,
+            **self._updater_kwargs("command", data["command"],
+                                   data["response_url"]),
             text=data["text"],
             trigger=data.get("trigger_id"),
             user=CALLER(
@@ -272,13 +533,10 @@ class Flack:
             )
         )
 
-        return self._response(response, response_url=data["response_url"])
+        return response
 
-    @get_json_data
-    @validate_token
-    @wrap_errors
-    def dispatch_action(self, data: dict) -> Union[str, dict]:
-        """ Parse and dispatch an action """
+    def _run_action(self, data: Mapping):
+        """ Run the handler for a block action payload """
 
         if not len(data["actions"]):
             raise AttributeError("No action supplied")
@@ -295,7 +553,10 @@ class Flack:
         logger.info("Running action: %s with value: %s",
                     action["action_id"], action["value"])
 
-        response = callback(
+        response = self._call(
+            "action", data, callback,
+            **self._updater_kwargs("action", action["action_id"],
+                                   data["response_url"]),
             value=action["value"],
             trigger=data.get("trigger_id"),
             message_ts=data.get("message", {}).get("ts"),
@@ -311,28 +572,94 @@ class Flack:
             )
         )
 
-        return self._response(response, response_url=data["response_url"])
+        return response
+
+    def _run_event(self, data: Mapping) -> None:
+        """ Queue the event of an Events API request """
+
+        if data.get("type") == "url_verification":
+            return None
+
+        elif data.get("type") != "event_callback":
+            logger.error("Unknown event request: %s", data.get("type"))
+            abort(400)
+
+        event_type = data["event"]["type"]
+        if event_type not in self.events:
+            logger.debug("Ignoring unhandled event: %s", event_type)
+            return None
+
+        if not self.event_queue.put(data):
+            # Slack will retry the event later on
+            abort(503)
+
+        return None
 
-    def trigger(self, trigger_word: str, **kwargs: str) -> Callable:
+    def _respond_event(self, data: Mapping, message) -> Union[str, dict]:
+        """ Acknowledge an Events API request """
+
+        if data.get("type") == "url_verification":
+            return jsonify({"challenge": data["challenge"]})
+
+        return ""
+
+    def _handle_event(self, data: dict) -> None:
+        """ Run the handler for a queued event """
+
+        event = data["event"]
+        callback = self.events[event["type"]]
+
+        logger.info("Running event: %s", event["type"])
+
+        with self.app.app_context():
+            callback(event=event, team=data.get("team_id"))
+
+    def _admission(self, fn: Callable, limit: str,
+                   max_concurrent: int) -> Callable:
+        # Handlers may be registered before init_app resolves the config
+        return admission(fn, limit, max_concurrent, message=lambda: (
+            self.config["FLACK_LIMIT_MESSAGE"]))
+
+    def _budget(self, fn: Callable, budget: float) -> TimeBudget:
+        return TimeBudget(fn, budget, message=lambda: (
+            self.config["FLACK_DEFERRED_MESSAGE"]))
+
+    def trigger(
+        self,
+        trigger_word: str,
+        limit: str = None,
+        max_concurrent: int = None,
+        **kwargs: str
+    ) -> Callable:
         """ Register a trigger word handler """
 
         if not trigger_word:
             raise AttributeError("invalid invocation")
 
-        kwargs.setdefault("as_user", self.app.config["FLACK_DEFAULT_NAME"])
+        elif limit and parse_limit(limit).scope == "channel":
+            # Triggers are not passed a channel to limit by
+            raise AttributeError("triggers can't be limited per channel")
 
         def decorator(fn):
             logger.debug("Register trigger: {}".format(trigger_word))
 
+            # Falls back to FLACK_DEFAULT_NAME when responding
             self.triggers[trigger_word] = SLACK_TRIGGER(
-                callback=fn,
-                user=kwargs["as_user"])
+                callback=self._admission(fn, limit, max_concurrent),
+                user=kwargs.get("as_user"))
 
             return fn
 
         return decorator
 
-    def command(self, name: str) -> Callable:
+    def command(
+        self,
+        name: str,
+        limit: str = None,
+        max_concurrent: int = None,
+        budget: float = None,
+        updates: bool = False
+    ) -> Callable:
         """ Register a slash-command handler """
 
         if not name:
@@ -340,12 +667,27 @@ class Flack:
 
         def decorator(fn):
             logger.debug("Register command: {}".format(name))
-            self.commands[name] = fn
+            callback = fn
+
+            if updates:
+                self._updates.add(("command", name))
+                callback = closing_updater(callback)
+
+            callback = self._admission(callback, limit, max_concurrent)
+            self.commands[name] = self._budget(callback, budget) if budget \
+                else callback
             return fn
 
         return decorator
 
-    def action(self, name: str) -> Callable:
+    def action(
+        self,
+        name: str,
+        limit: str = None,
+        max_concurrent: int = None,
+        budget: float = None,
+        updates: bool = False
+    ) -> Callable:
         """ Register a handler for actions """
 
         if not name:
@@ -353,7 +695,60 @@ class Flack:
 
         def decorator(fn):
             logger.debug("Register action: {}".format(name))
-            self.actions[name] = fn
+            callback = fn
+
+            if updates:
+                self._updates.add(("action", name))
+                callback = closing_updater(callback)
+
+            callback = self._admission(callback, limit, max_concurrent)
+            self.actions[name] = self._budget(callback, budget) if budget \
+                else callback
+            return fn
+
+        return decorator
+
+    def schedule(
+        self,
+        url: str,
+        every: float = None,
+        at: Union[float, datetime] = None
+    ) -> Callable:
+        """ Register a handler posting to a url on a schedule """
+
+        if not url or not (every or at):
+            raise AttributeError("invalid invocation")
+
+        elif self.scheduler is None:
+            raise ConfigError("Flack must be initialized before scheduling")
+
+        if isinstance(at, datetime):
+            at = at.timestamp()
+
+        def decorator(fn):
+            logger.debug("Register schedule: %s", fn.__name__)
+
+            # The same in every process, a run is only claimed by one of them
+            job_id = "{}:{}.{}:{}:{}".format(self.name, fn.__module__,
+                                             fn.__qualname__, url, every)
+            if job_id in self.scheduler:
+                raise AttributeError("already scheduled: {}".format(job_id))
+
+            self.scheduler.schedule(at or time.time() + every, url, fn,
+                                    interval=every, job_id=job_id)
+            return fn
+
+        return decorator
+
+    def event(self, event_type: str) -> Callable:
+        """ Register an Events API handler """
+
+        if not event_type:
+            raise AttributeError("invalid invocation")
+
+        def decorator(fn):
+            logger.debug("Register event: {}".format(event_type))
+            self.events[event_type] = fn
             return fn
 
         return decorator
@@ -0,0 +1,121 @@
+# coding=utf-8
+import logging
+import time
+from threading import Lock
+from statistics import median
+from collections import deque
+from typing import Callable
+
+from flask import (
+    current_app, has_request_context, copy_current_request_context
+)
+
+from .message import PrivateResponse
+
+__all__ = ["TimeBudget", ]
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DEFERRED_MESSAGE = "Working on it…"
+DEFAULT_DEFERRED_ERROR_MESSAGE = "Sorry, something went wrong."
+
+
+class TimeBudget:
+    """ Runs a handler with a deadline, deferring its result past the deadline
+
+    Once the median of the recent run times exceeds the budget, the handler
+    is deferred right away, until it speeds up again.
+    """
+
+    def __init__(
+        self,
+        fn: Callable,
+        budget: float,
+        window: int = 10,
+        message: Callable[[], str] = None,
+    ) -> None:
+        self.fn = fn
+        self.budget = budget
+        self.message = message
+
+        self.latencies = deque(maxlen=window)
+        self._lock = Lock()
+
+    @property
+    def tripped(self) -> bool:
+        with self._lock:
+            if len(self.latencies) < self.latencies.maxlen // 2:
+                return False
+
+            return median(self.latencies) > self.budget
+
+    def _bind(self, kwargs: dict) -> Callable:
+        """ Carry the current flask context over to a worker thread """
+
+        def task():
+            started = time.monotonic()
+
+            try:
+                return self.fn(**kwargs)
+
+            finally:
+                with self._lock:
+                    self.latencies.append(time.monotonic() - started)
+
+        if has_request_context():
+            return copy_current_request_context(task)
+
+        app = current_app._get_current_object()
+
+        def app_task():
+            with app.app_context():
+                return task()
+
+        return app_task
+
+    def _deliver(self, deliver: Callable, fail: Callable, future) -> None:
+        try:
+            result = future.result()
+
+        except Exception as e:
+            logger.exception("Caught: %r, in deferred handler.", e)
+
+            try:
+                fail(e)
+
+            except Exception as e:
+                logger.exception("Caught: %r, reporting deferred error.", e)
+
+            return
+
+        try:
+            deliver(result)
+
+        except Exception as e:
+            logger.exception("Caught: %r, delivering deferred result.", e)
+
+    def run(self, executor, deliver: Callable, fail: Callable, **kwargs):
+        """ Returns the result, or a placeholder if it's delivered later
+
+        A late result is passed to `deliver`, and a late error to `fail`.
+        """
+
+        from concurrent.futures import TimeoutError
+
+        tripped = self.tripped
+        future = executor.submit(self._bind(kwargs))
+
+        if tripped:
+            logger.info("Deferring slow handler: %s", self.fn.__name__)
+
+        else:
+            try:
+                return future.result(timeout=self.budget)
+
+            except TimeoutError:
+                logger.info("Handler: %s exceeded its budget of %ss",
+                            self.fn.__name__, self.budget)
+
+        future.add_done_callback(lambda f: self._deliver(deliver, fail, f))
+        return PrivateResponse(self.message() if self.message
+                               else DEFAULT_DEFERRED_MESSAGE)
@@ -0,0 +1,215 @@
+# coding=utf-8
+import logging
+import time
+from threading import Lock
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from .transport import post, LazyExecutor
+
+__all__ = ["Directory", "LRUCache", "RateLimited", ]
+
+logger = logging.getLogger(__name__)
+
+SLACK_API_URL = "https://slack.com/api/{}"
+
+# Seconds before retrying a failed prefetch of a workspace
+PREFETCH_BACKOFF = 300
+
+
+class RateLimited(Exception):
+    """ Slack responded with HTTP 429 """
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__("Rate limited, retry after {}s".format(retry_after))
+        self.retry_after = retry_after
+
+
+class LRUCache:
+    """ Size-bounded LRU cache where entries go stale after `ttl` seconds """
+
+    def __init__(self, max_size: int = 10000, ttl: float = 3600) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key) -> bool:
+        return key in self._entries
+
+    def get(self, key) -> tuple:
+        """ Returns (value, fresh), raises KeyError on a miss """
+
+        with self._lock:
+            value, stored = self._entries[key]
+            self._entries.move_to_end(key)
+
+        return value, time.monotonic() - stored < self.ttl
+
+    def set(self, key, value) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+class Directory:
+    """ Cached view of the users and channels in one or more workspaces """
+
+    def __init__(
+        self,
+        token_loader: Callable[[str], str],
+        max_size: int = 10000,
+        ttl: float = 3600,
+    ) -> None:
+        self.token_loader = token_loader
+
+        self.users = LRUCache(max_size, ttl)
+        self.channels = LRUCache(max_size, ttl)
+
+        self._prefetched = set()
+        self._prefetch_after = {}
+        self._limited_until = {}
+        self._pending = set()
+        self._lock = Lock()
+        self._executor = LazyExecutor(1)
+
+    def _call(self, team: str, method: str, **params) -> dict:
+        """ Call a Slack Web API method on behalf of a workspace """
+
+        limited = self._limited_until.get(team, 0) - time.monotonic()
+        if limited > 0:
+            raise RateLimited(limited)
+
+        token = self.token_loader(team)
+        logger.debug("Calling %s for team: %s", method, team)
+
+        response = post(SLACK_API_URL.format(method), data=params, headers={
+            "Authorization": "Bearer {}".format(token)
+        })
+
+        if response.status_code == 429:
+            try:
+                retry_after = float(response.headers.get("Retry-After", 60))
+
+            except ValueError:
+                retry_after = 60
+
+            self._limited_until[team] = time.monotonic() + retry_after
+            raise RateLimited(retry_after)
+
+        response.raise_for_status()
+
+        data = response.json()
+        if not data.get("ok"):
+            raise ValueError("Slack API error: {}".format(data.get("error")))
+
+        return data
+
+    def _paginate(self, team: str, method: str, key: str, **params):
+        cursor = ""
+        while True:
+            data = self._call(team, method, cursor=cursor, limit=200, **params)
+            yield from data.get(key, [])
+
+            cursor = data.get("response_metadata", {}).get("next_cursor")
+            if not cursor:
+                break
+
+    def prefetch(self, team: str) -> None:
+        """ Bulk load every user and channel in a workspace """
+
+        logger.info("Prefetching directory for team: %s", team)
+
+        try:
+            for user in self._paginate(team, "users.list", "members"):
+                self.users.set((team, user["id"]), user)
+
+            for channel in self._paginate(
+                    team, "conversations.list", "channels",
+                    types="public_channel,private_channel"):
+                self.channels.set((team, channel["id"]), channel)
+
+        except Exception as e:
+            # Don't start another full crawl on every lookup
+            backoff = max(PREFETCH_BACKOFF, getattr(e, "retry_after", 0))
+            with self._lock:
+                self._prefetch_after[team] = time.monotonic() + backoff
+
+            raise
+
+        with self._lock:
+            self._prefetched.add(team)
+
+    def _submit(self, key: tuple, fn: Callable, *args) -> None:
+        """ Run a refresh in the background, at most once per key """
+
+        with self._lock:
+            if key in self._pending:
+                return
+
+            self._pending.add(key)
+
+        def task():
+            try:
+                fn(*args)
+
+            except Exception:
+                logger.exception("Directory refresh failed: %r", key)
+
+            finally:
+                with self._lock:
+                    self._pending.discard(key)
+
+        self._executor.submit(task)
+
+    def _refresh_user(self, team: str, user_id: str) -> dict:
+        user = self._call(team, "users.info", user=user_id)["user"]
+        self.users.set((team, user_id), user)
+        return user
+
+    def _refresh_channel(self, team: str, channel_id: str) -> dict:
+        channel = self._call(team, "conversations.info",
+                             channel=channel_id)["channel"]
+        self.channels.set((team, channel_id), channel)
+        return channel
+
+    def _lookup(self, cache: LRUCache, refresh: Callable,
+                team: str, item_id: str) -> Optional[dict]:
+        if team not in self._prefetched and \
+                time.monotonic() >= self._prefetch_after.get(team, 0):
+            self._submit(("prefetch", team), self.prefetch, team)
+
+        try:
+            value, fresh = cache.get((team, item_id))
+
+        except KeyError:
+            # Nothing to serve yet, this is the only blocking path
+            try:
+                return refresh(team, item_id)
+
+            except Exception:
+                logger.exception("Directory lookup failed: %s", item_id)
+                return None
+
+        if not fresh:
+            # Serve the stale copy and update it behind the scenes
+            self._submit((refresh.__name__, team, item_id),
+                         refresh, team, item_id)
+
+        return value
+
+    def user(self, team: str, user_id: str) -> Optional[dict]:
+        """ Full user object, as returned by users.info """
+        return self._lookup(self.users, self._refresh_user, team, user_id)
+
+    def channel(self, team: str, channel_id: str) -> Optional[dict]:
+        """ Full conversation object, as returned by conversations.info """
+        return self._lookup(self.channels, self._refresh_channel,
+                            team, channel_id)
@@ -0,0 +1,117 @@
+# coding=utf-8
+import logging
+from threading import Thread, Lock
+from queue import Queue, Empty, Full
+from typing import Callable
+
+from .directory import LRUCache
+from .transport import after_fork
+
+__all__ = ["EventQueue", ]
+
+logger = logging.getLogger(__name__)
+
+
+class EventQueue:
+    """ In-process queue, drained in batches by a pool of worker threads
+
+    Events are sharded by channel, so events within a channel are always
+    processed in the order they were received.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[dict], None],
+        workers: int = 4,
+        batch_size: int = 10,
+        max_size: int = 10000,
+    ) -> None:
+        self.handler = handler
+        self.batch_size = batch_size
+
+        self.workers = workers
+        self.max_size = max_size
+
+        self._seen = LRUCache(max_size, ttl=3600)
+        self._reset()
+
+        after_fork(self._reset)
+
+    def _reset(self) -> None:
+        # Threads are only started on demand, and never survive a fork
+        self._shards = [Queue(self.max_size) for _ in range(self.workers)]
+        self._threads = []
+        self._lock = Lock()
+        self._put_lock = Lock()
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._threads:
+                return
+
+            for shard in self._shards:
+                thread = Thread(target=self._worker, args=(shard, ),
+                                name="flack-events", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def put(self, payload: dict) -> bool:
+        """ Enqueue an event_callback payload, returns False when full """
+
+        event_id = payload.get("event_id")
+
+        # Shard on the channel id, some events carry the full channel object
+        event = payload.get("event", {})
+        channel = event.get("channel")
+        if isinstance(channel, dict):
+            channel = channel.get("id")
+
+        shard = self._shards[hash(channel or event_id) % len(self._shards)]
+
+        self._start()
+
+        # Concurrent retries of the same event must not both get through
+        with self._put_lock:
+            if event_id and event_id in self._seen:
+                logger.debug("Ignoring duplicate event: %s", event_id)
+                return True
+
+            try:
+                shard.put_nowait(payload)
+
+            except Full:
+                # Not marked as seen, Slack's retry gets another chance
+                logger.error("Event queue is full, dropping: %s", event_id)
+                return False
+
+            if event_id:
+                self._seen.set(event_id, True)
+
+            return True
+
+    def join(self) -> None:
+        """ Block until every queued event has been processed """
+        for shard in self._shards:
+            shard.join()
+
+    def _worker(self, shard: Queue) -> None:
+        while True:
+            batch = [shard.get()]
+
+            try:
+                while len(batch) < self.batch_size:
+                    batch.append(shard.get_nowait())
+
+            except Empty:
+                pass
+
+            logger.debug("Processing %d events", len(batch))
+            for payload in batch:
+                try:
+                    self.handler(payload)
+
+                except Exception as e:
+                    logger.exception("Caught: %r, while processing event.", e)
+
+                finally:
+                    shard.task_done()
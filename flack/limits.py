@@ -0,0 +1,144 @@
+# coding=utf-8
+import logging
+import re
+import time
+from functools import wraps
+from threading import Lock, BoundedSemaphore
+from collections import namedtuple
+from typing import Callable
+
+from .message import PrivateResponse
+from .directory import LRUCache
+
+__all__ = ["parse_limit", "TokenBucket", "admission", ]
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LIMIT_MESSAGE = "Slow down! Please try again in a little while."
+
+PERIODS = {
+    "s": 1, "sec": 1, "second": 1,
+    "m": 60, "min": 60, "minute": 60,
+    "h": 3600, "hour": 3600,
+    "d": 86400, "day": 86400,
+}
+SCOPES = {"user", "channel", "team", "global"}
+
+LIMIT_RE = re.compile(r"^\s*(\d+)\s*/\s*(\d*)\s*([a-z]+)(?:\s+per\s+([a-z]+))?\s*$")
+
+RATE_LIMIT = namedtuple("rate_limit", ("rate", "period", "scope"))
+
+
+def parse_limit(spec: str) -> RATE_LIMIT:
+    """ Parses limits such as "5/min per user" or "100/10s" """
+
+    match = LIMIT_RE.match(spec.lower())
+    if not match:
+        raise AttributeError("invalid limit: {}".format(spec))
+
+    rate, multiplier, unit, scope = match.groups()
+    scope = scope or "global"
+
+    if unit not in PERIODS or scope not in SCOPES:
+        raise AttributeError("invalid limit: {}".format(spec))
+
+    period = PERIODS[unit] * int(multiplier or 1)
+    return RATE_LIMIT(int(rate), period, scope)
+
+
+class TokenBucket:
+    """ Allows bursts of up to `rate` calls, refilled over `period` seconds """
+
+    def __init__(self, rate: int, period: float) -> None:
+        self.capacity = rate
+        self.refill = rate / period
+
+        self.tokens = float(rate)
+        self.updated = time.monotonic()
+
+    def consume(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.capacity,
+                          self.tokens + (now - self.updated) * self.refill)
+        self.updated = now
+
+        if self.tokens < 1:
+            return False
+
+        self.tokens -= 1
+        return True
+
+
+def _scope_key(scope: str, kwargs: dict):
+    if scope == "global":
+        return None
+
+    elif scope == "team":
+        return kwargs["user"].team
+
+    obj = kwargs[scope]
+    return (obj.team, obj.id)
+
+
+def admission(
+    fn: Callable,
+    limit: str = None,
+    max_concurrent: int = None,
+    max_keys: int = 10000,
+    message: Callable[[], str] = None,
+) -> Callable:
+    """ Wraps a handler with a rate limit and/or a concurrency limit
+
+    `message` returns the private reply sent instead of calling the handler.
+    """
+
+    if not limit and not max_concurrent:
+        return fn
+
+    rate_limit = parse_limit(limit) if limit else None
+    semaphore = BoundedSemaphore(max_concurrent) if max_concurrent else None
+
+    # Idle buckets are full again after a period, and safe to evict
+    buckets = LRUCache(max_keys, ttl=rate_limit.period if limit else 0)
+    lock = Lock()
+
+    def reject(reason):
+        logger.info("Rejected call to: %s, %s", fn.__name__, reason)
+        return PrivateResponse(message() if message
+                               else DEFAULT_LIMIT_MESSAGE)
+
+    @wraps(fn)
+    def inner(*args, **kwargs):
+        if rate_limit:
+            key = _scope_key(rate_limit.scope, kwargs)
+
+            with lock:
+                try:
+                    bucket, fresh = buckets.get(key)
+
+                except KeyError:
+                    bucket, fresh = None, False
+
+                if not fresh:
+                    bucket = TokenBucket(rate_limit.rate, rate_limit.period)
+
+                # Store on every call, this keeps active keys fresh
+                buckets.set(key, bucket)
+                allowed = bucket.consume()
+
+            if not allowed:
+                return reject("rate limit exceeded for: {}".format(key))
+
+        if semaphore is None:
+            return fn(*args, **kwargs)
+
+        if not semaphore.acquire(blocking=False):
+            return reject("too many concurrent calls")
+
+        try:
+            return fn(*args, **kwargs)
+
+        finally:
+            semaphore.release()
+
+    return inner
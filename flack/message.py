@@ -2,10 +2,15 @@
 from abc import ABC
 from collections import namedtuple
 
-__all__ = ["PrivateResponse", "IndirectResponse", "Attachment", "Action", ]
+__all__ = [
+    "PrivateResponse", "IndirectResponse", "DelayedResponse",
+    "Attachment", "Action",
+]
 
 PrivateResponse = namedtuple("PrivateResponse", ("feedback"))
 IndirectResponse = namedtuple("IndirectResponse", ("feedback", "indirect"))
+DelayedResponse = namedtuple("DelayedResponse",
+                             ("feedback", "indirect", "delay"))
 
 
 class SlackObject(ABC):
@@ -4,10 +4,10 @@ from functools import wraps
 from collections import namedtuple
 from typing import Callable
 
-from requests import post, HTTPError
 from flask import request, render_template, abort
 from flask import current_app as app
 
+from .transport import post
 from .exceptions import OAuthConfigError, OAuthError
 
 __all__ = ["render_button", "callback", ]
@@ -39,6 +39,8 @@ def render_button() -> str:
 def _oauth_callback_response(code: str) -> OAuthCredentials:
     """ Request OAuth credentials from Slack """
 
+    from requests import HTTPError
+
     try:
         logger.debug(u"Requesting OAuth Credentials")
         response = post("https://slack.com/api/oauth.access", data={
@@ -0,0 +1,22 @@
+# coding=utf-8
+import json
+from functools import lru_cache
+from typing import Callable
+
+__all__ = ["json_loads", ]
+
+
+@lru_cache(maxsize=None)
+def _decoder() -> Callable:
+    """ Prefer orjson when it's installed, see: `pip install flack[fast]` """
+
+    try:
+        import orjson
+        return orjson.loads
+
+    except ImportError:
+        return json.loads
+
+
+def json_loads(raw):
+    return _decoder()(raw)
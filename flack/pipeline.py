@@ -0,0 +1,214 @@
+# coding=utf-8
+import logging
+import time
+import hmac
+import hashlib
+from typing import Callable, Mapping, Sequence
+
+from flask import request, abort
+from werkzeug.exceptions import HTTPException
+
+from .payload import json_loads
+from .exceptions import ConfigError
+
+__all__ = ["compile_view", "compile_handler", "form_data", "json_payload", "json_body", ]
+
+logger = logging.getLogger(__name__)
+
+
+def form_data() -> Mapping:
+    """ Extracts a form-encded payload from request """
+
+    # Parsed on first access, no need for a copy
+    return request.form
+
+
+def _decode(raw) -> dict:
+    try:
+        data = json_loads(raw)
+
+    except ValueError:
+        logger.error("Malformed json payload")
+        abort(400)
+
+    if not isinstance(data, dict):
+        logger.error("Expected a json object, got: %s", type(data).__name__)
+        abort(400)
+
+    return data
+
+
+def json_payload() -> Mapping:
+    """ Extracts a json payload from request """
+    return _decode(request.form["payload"])
+
+
+def json_body() -> Mapping:
+    """ Extracts a json-encoded request body """
+    return _decode(request.get_data())
+
+
+def _verifier(config: dict) -> Callable:
+    """ Verifies the request signature, before the payload is parsed """
+
+    max_length = config["FLACK_MAX_CONTENT_LENGTH"]
+    max_age = config["FLACK_SIGNATURE_MAX_AGE"]
+    signing_secret = config["FLACK_SIGNING_SECRET"].encode()
+
+    def verify() -> None:
+        if max_length:
+            if (request.content_length or 0) > max_length:
+                logger.error("Request body too large: %s",
+                             request.content_length)
+                abort(413)
+
+            if request.content_length is None:
+                # Chunked, read one byte past the limit to tell if it's over
+                request.max_content_length = max_length + 1
+                if len(request.get_data()) > max_length:
+                    logger.error("Request body too large")
+                    abort(413)
+
+        if not signing_secret:
+            return
+
+        timestamp = request.headers.get("X-Slack-Request-Timestamp", "")
+        signature = request.headers.get("X-Slack-Signature", "")
+
+        try:
+            age = abs(time.time() - int(timestamp))
+
+        except ValueError:
+            logger.error("Invalid signature timestamp")
+            abort(403)
+
+        if age > max_age:
+            logger.error("Expired signature timestamp: %s", timestamp)
+            abort(403)
+
+        # The raw body is cached, and reused when parsing the payload
+        base = b"v0:" + timestamp.encode() + b":" + request.get_data()
+        expected = "v0=" + hmac.new(signing_secret, base,
+                                    hashlib.sha256).hexdigest()
+
+        if not hmac.compare_digest(expected.encode(), signature.encode()):
+            logger.error("Invalid Signature")
+            abort(403)
+
+    return verify
+
+
+def _token_validator(config: dict) -> Callable:
+    """ Validates payload tokens """
+
+    flack_token = config["FLACK_TOKEN"].encode()
+    signing_secret = config["FLACK_SIGNING_SECRET"]
+
+    def validate(data: Mapping) -> None:
+        if not flack_token:
+            if not signing_secret:
+                raise ConfigError("A token or signing secret must be defined")
+
+            # Already verified by the request signature
+            return
+
+        request_token = (data.get("token") or "").encode()
+        if not hmac.compare_digest(request_token, flack_token):
+            logger.error("Invalid Token")
+            abort(403)
+
+    return validate
+
+
+def compile_handler(
+    kind: str,
+    run: Callable,
+    respond: Callable,
+    before: Sequence[Callable] = (),
+    after: Sequence[Callable] = (),
+    errors: Sequence[Callable] = (),
+) -> Callable:
+    """ Build a handler running the hooks around `run`, for any transport
+
+    - `before` hooks are called with (kind, data), the first one to return
+      anything other than None skips the handler and provides the message.
+    - `run` invokes the handler, and returns its message.
+    - `after` hooks are called with (kind, data, message), and return the
+      (possibly altered) message.
+    - `respond` turns the message into a response.
+    - `errors` hooks are called with (kind, data, exception), the first one to
+      return anything other than None provides the message, otherwise the
+      error is raised.
+    """
+
+    before, after, errors = tuple(before), tuple(after), tuple(errors)
+
+    def handle(data: Mapping):
+        try:
+            for hook in before:
+                message = hook(kind, data)
+                if message is not None:
+                    break
+
+            else:
+                message = run(data)
+
+            for hook in after:
+                message = hook(kind, data, message)
+
+            return respond(data, message)
+
+        except HTTPException:
+            # No need to alter an HTTP response
+            raise
+
+        except Exception as e:
+            for hook in errors:
+                message = hook(kind, data, e)
+                if message is not None:
+                    return respond(data, message)
+
+            raise
+
+    return handle
+
+
+def compile_view(
+    config: dict,
+    kind: str,
+    parse: Callable[[], dict],
+    run: Callable,
+    respond: Callable,
+    before: Sequence[Callable] = (),
+    after: Sequence[Callable] = (),
+    errors: Sequence[Callable] = (),
+) -> Callable:
+    """ Build a view function, running every dispatch stage in order
+
+    The raw request is verified, and then parsed by `parse`, before it's
+    passed on to a handler built by `compile_handler`. `respond` turns the
+    message into an HTTP response, and unhandled errors are coerced to
+    HTTP 500.
+    """
+
+    verify = _verifier(config)
+    validate = _token_validator(config)
+    handle = compile_handler(kind, run, respond, before, after, errors)
+
+    def view():
+        verify()
+        data = parse()
+        validate(data)
+
+        try:
+            return handle(data)
+
+        except HTTPException:
+            raise
+
+        except Exception as e:
+            logger.exception("Caught: %r, coercing to HTTP 500.", e)
+            abort(500)
+
+    view.__name__ = kind
+    return view
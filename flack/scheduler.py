@@ -0,0 +1,247 @@
+# coding=utf-8
+import logging
+import time
+import json
+import heapq
+import itertools
+from uuid import uuid4
+from threading import Thread, Condition
+from collections import namedtuple
+from typing import Callable, Union
+
+from .transport import LazyExecutor, after_fork
+
+__all__ = ["Scheduler", ]
+
+logger = logging.getLogger(__name__)
+
+JOB = namedtuple("job", ("id", "due", "url", "message", "interval", "durable"))
+
+
+class Scheduler:
+    """ Heap of pending jobs, posted to their url by a single timer thread
+
+    Nothing runs until `start` is called, in the process serving requests,
+    so jobs can safely be scheduled before e.g. gunicorn forks its workers.
+
+    Durable jobs, with a static message (a response body dict) or a stable
+    `job_id`, can optionally be persisted to SQLite. The database is opened
+    once the scheduler starts, persisted jobs are resumed, and every due job
+    is claimed by exactly one of the processes sharing the database.
+    """
+
+    def __init__(
+        self,
+        deliver: Callable[[str, Union[dict, Callable]], None],
+        path: str = None,
+        workers: int = 4,
+    ) -> None:
+        self.deliver = deliver
+        self.path = path
+
+        self._heap = []
+        self._jobs = {}
+        self._counter = itertools.count()
+
+        self._executor = LazyExecutor(workers)
+        self._reset()
+
+        after_fork(self._reset)
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def __contains__(self, job_id: str) -> bool:
+        return job_id in self._jobs
+
+    def _reset(self) -> None:
+        # Neither threads nor database connections survive a fork
+        self._condition = Condition()
+        self._thread = None
+        self._db = None
+
+        # Job ids stay unique across processes, without a uuid per job
+        self._prefix = uuid4().hex
+
+    def _open(self, path: str):
+        import sqlite3
+
+        db = sqlite3.connect(path, check_same_thread=False,
+                             isolation_level=None)
+        db.execute("CREATE TABLE IF NOT EXISTS flack_jobs ("
+                   "id TEXT PRIMARY KEY, due REAL, url TEXT, "
+                   "message TEXT, interval REAL)")
+
+        # Jobs registered by another process first keep their schedule
+        for job in list(self._jobs.values()):
+            self._persist(db, job, replace=False)
+
+        for job_id, due, url, message, interval in db.execute(
+                "SELECT id, due, url, message, interval FROM flack_jobs"):
+            if job_id in self._jobs:
+                self._push(self._jobs[job_id]._replace(due=due))
+
+            elif message is not None:
+                self._push(JOB(job_id, due, url, json.loads(message),
+                               interval, True))
+
+        logger.info("Loaded %d scheduled jobs", len(self._jobs))
+        return db
+
+    def _persist(self, db, job: JOB, replace: bool = True) -> None:
+        if not job.durable:
+            return
+
+        # Callables are kept in memory, only their schedule is stored
+        message = None if callable(job.message) else json.dumps(job.message)
+
+        db.execute(
+            "INSERT OR {} INTO flack_jobs VALUES (?, ?, ?, ?, ?)".format(
+                "REPLACE" if replace else "IGNORE"),
+            (job.id, job.due, job.url, message, job.interval))
+
+    def _claim(self, job: JOB, due: float = None) -> bool:
+        """ Take a due job from the database, before another process does """
+
+        if self._db is None or not job.durable:
+            return True
+
+        if due is None:
+            claimed = self._db.execute(
+                "DELETE FROM flack_jobs WHERE id = ? AND due = ?",
+                (job.id, job.due)).rowcount
+
+        else:
+            claimed = self._db.execute(
+                "UPDATE flack_jobs SET due = ? WHERE id = ? AND due = ?",
+                (due, job.id, job.due)).rowcount
+
+        if claimed:
+            return True
+
+        # Run, or cancelled, by another process
+        row = self._db.execute("SELECT due FROM flack_jobs WHERE id = ?",
+                               (job.id, )).fetchone()
+        if row is None:
+            self._jobs.pop(job.id, None)
+
+        else:
+            self._push(job._replace(due=row[0]))
+
+        return False
+
+    def _push(self, job: JOB) -> None:
+        self._jobs[job.id] = job
+        heapq.heappush(self._heap, (job.due, next(self._counter), job.id))
+
+    def start(self) -> None:
+        """ Start the timer thread, unless it's already running """
+
+        if self._thread is not None:
+            return
+
+        with self._condition:
+            if self._thread is not None:
+                return
+
+            if self.path:
+                self._db = self._open(self.path)
+
+            self._thread = Thread(target=self._run, name="flack-scheduler",
+                                  daemon=True)
+            self._thread.start()
+
+    def schedule(
+        self,
+        due: float,
+        url: str,
+        message: Union[dict, Callable],
+        interval: float = None,
+        job_id: str = None,
+    ) -> str:
+        """ Post a message (or the result of a callable) at a unix timestamp
+
+        Recurring jobs are posted every `interval` seconds from then on.
+        Callables are only persisted when given a stable `job_id`.
+        """
+
+        job = JOB(job_id or "{}.{}".format(self._prefix, next(self._counter)),
+                  due, url, message, interval,
+                  job_id is not None or not callable(message))
+
+        with self._condition:
+            self._push(job)
+
+            if self._db is not None:
+                self._persist(self._db, job)
+
+            if self._heap[0][2] == job.id:
+                # Wake up the timer, this is the next job due
+                self._condition.notify()
+
+        return job.id
+
+    def cancel(self, job_id: str) -> bool:
+        """ Cancel a pending job, it's dropped from the heap once due """
+
+        with self._condition:
+            if self._db is not None:
+                self._db.execute("DELETE FROM flack_jobs WHERE id = ?",
+                                 (job_id, ))
+
+            return self._jobs.pop(job_id, None) is not None
+
+    def _next(self) -> JOB:
+        """ Wait for, and pop, the next job that's due """
+
+        with self._condition:
+            while True:
+                if not self._heap:
+                    self._condition.wait()
+                    continue
+
+                due, _, job_id = self._heap[0]
+                job = self._jobs.get(job_id)
+                if job is None or job.due != due:
+                    # Cancelled, or rescheduled
+                    heapq.heappop(self._heap)
+                    continue
+
+                delay = due - time.time()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+
+                heapq.heappop(self._heap)
+
+                if job.interval:
+                    # Skip any runs missed while we were down
+                    missed = max(0, (time.time() - due) // job.interval)
+                    due += job.interval * (missed + 1)
+
+                    if not self._claim(job, due):
+                        continue
+
+                    self._push(job._replace(due=due))
+
+                else:
+                    if not self._claim(job):
+                        continue
+
+                    del self._jobs[job_id]
+
+                return job
+
+    def _run(self) -> None:
+        while True:
+            job = self._next()
+            logger.debug("Running scheduled job: %s", job.id)
+
+            self._executor.submit(self._deliver, job)
+
+    def _deliver(self, job: JOB) -> None:
+        try:
+            self.deliver(job.url, job.message)
+
+        except Exception as e:
+            logger.exception("Caught: %r, in scheduled job.", e)
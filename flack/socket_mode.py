@@ -0,0 +1,176 @@
+# coding=utf-8
+import logging
+import time
+import json
+
+from werkzeug.exceptions import HTTPException
+
+from . import _send_message
+from .transport import post, LazyExecutor
+from .exceptions import ConfigError
+
+__all__ = ["SocketModeRunner", ]
+
+logger = logging.getLogger(__name__)
+
+CONNECTIONS_OPEN_URL = "https://slack.com/api/apps.connections.open"
+
+
+class SocketModeRunner:
+    """ Receives Slack interactions over a Socket Mode WebSocket connection
+
+    Requires the `websocket-client` package, see: `pip install flack[socket]`
+    """
+
+    def __init__(self, flack, app_token: str = None, workers: int = None):
+        config = flack.config
+
+        self.flack = flack
+        self.app_token = app_token or config.get("FLACK_APP_TOKEN")
+        if not self.app_token:
+            raise ConfigError("An app-level token must be defined")
+
+        self.executor = LazyExecutor(
+            workers or config.get("FLACK_SOCKET_WORKERS", 4))
+
+        self.connection = None
+        self.running = False
+
+    def _open_url(self) -> str:
+        """ Request a WebSocket url for a new connection """
+
+        response = post(CONNECTIONS_OPEN_URL, headers={
+            "Authorization": "Bearer {}".format(self.app_token)
+        })
+        response.raise_for_status()
+
+        data = response.json()
+        if not data.get("ok"):
+            raise ConfigError("Slack rejected the app token: {}".format(
+                data.get("error")))
+
+        return data["url"]
+
+    def _connect(self, url: str):
+        try:
+            import websocket
+
+        except ImportError:
+            raise ConfigError("Socket Mode requires websocket-client")
+
+        return websocket.create_connection(url)
+
+    def run(self, reconnect_delay: float = 1) -> None:
+        """ Receive envelopes until stopped, reconnecting as needed """
+
+        self.flack.scheduler.start()
+
+        self.running = True
+        while self.running:
+            try:
+                self.connection = self._connect(self._open_url())
+                self._receive()
+
+            except ConfigError:
+                raise
+
+            except Exception as e:
+                if self.running:
+                    logger.exception("Caught: %r, reconnecting.", e)
+                    time.sleep(reconnect_delay)
+
+            finally:
+                if self.connection is not None:
+                    self.connection.close()
+
+    def stop(self) -> None:
+        self.running = False
+
+        if self.connection is not None:
+            self.connection.close()
+
+        self.executor.shutdown(wait=True)
+
+    def _receive(self) -> None:
+        while self.running:
+            raw = self.connection.recv()
+            if not raw:
+                logger.info("Socket Mode connection closed")
+                return
+
+            envelope = json.loads(raw)
+
+            if envelope["type"] == "hello":
+                logger.info("Socket Mode connection established")
+                continue
+
+            elif envelope["type"] == "disconnect":
+                logger.info("Socket Mode disconnect requested: %s",
+                            envelope.get("reason"))
+                return
+
+            elif envelope["type"] == "events_api":
+                # Queued right away, unless the queue is full
+                if not self._queue(envelope):
+                    continue
+
+            else:
+                self.executor.submit(self._process, envelope)
+
+            if "envelope_id" in envelope:
+                # Slack retries anything not acked in 3s
+                self.connection.send(json.dumps({
+                    "envelope_id": envelope["envelope_id"]
+                }))
+
+    def _queue(self, envelope: dict) -> bool:
+        """ Queue an Events API envelope, returns False to have it retried """
+
+        with self.flack.app.app_context():
+            try:
+                self.flack._handlers["events"](envelope.get("payload", {}))
+
+            except HTTPException as e:
+                if e.code == 503:
+                    # Not acknowledged, Slack redelivers it later on
+                    logger.warning("Event queue is full, not acknowledging: "
+                                   "%s", envelope.get("envelope_id"))
+                    return False
+
+                logger.error("Rejected event envelope: %s", e)
+
+            except Exception as e:
+                logger.exception("Caught: %r, while queueing event.", e)
+
+        return True
+
+    def _process(self, envelope: dict) -> None:
+        """ Dispatch an envelope to the registered handlers """
+
+        kind = envelope["type"]
+        payload = envelope.get("payload", {})
+
+        with self.flack.app.app_context():
+            try:
+                if kind == "slash_commands":
+                    message = self.flack._handlers["command"](payload)
+
+                elif kind == "interactive" and \
+                        payload.get("type") == "block_actions":
+                    message = self.flack._handlers["action"](payload)
+
+                else:
+                    logger.error("Unknown envelope: %s", kind)
+                    return
+
+                response_url = payload["response_url"]
+                response = self.flack._build_response(
+                    message, response_url=response_url)
+
+                # Echoing the users input only works for HTTP responses
+                if response and (response.get("text") or
+                                 response.get("attachments")):
+                    _send_message(response_url, response, delay=0)
+
+            except Exception as e:
+                logger.exception("Caught: %r, while processing envelope.", e)
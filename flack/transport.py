@@ -0,0 +1,84 @@
+# coding=utf-8
+import os
+import weakref
+from threading import Lock
+from typing import Callable
+
+__all__ = ["post", "LazyExecutor", "after_fork", ]
+
+_fork_hooks = []
+
+_session_lock = Lock()
+_session = None
+
+
+def after_fork(method: Callable) -> None:
+    """ Call a bound method in the child process, after every fork """
+    _fork_hooks.append(weakref.WeakMethod(method))
+
+
+def _run_fork_hooks() -> None:
+    global _session_lock, _session
+    _session_lock, _session = Lock(), None
+
+    for ref in list(_fork_hooks):
+        method = ref()
+        if method is None:
+            _fork_hooks.remove(ref)
+
+        else:
+            method()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_run_fork_hooks)
+
+
+def post(url: str, **kwargs):
+    """ POST through a pooled session, created on first use """
+
+    global _session
+
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                from requests import Session
+                _session = Session()
+
+    return _session.post(url, **kwargs)
+
+
+class LazyExecutor:
+    """ Thread pool, only started on first use and restarted after a fork """
+
+    def __init__(self, workers: int = 1) -> None:
+        self.workers = workers
+
+        self._executor = None
+        self._lock = Lock()
+
+        after_fork(self._reset)
+
+    def _reset(self) -> None:
+        # Any threads belonged to the parent process
+        self._executor = None
+        self._lock = Lock()
+
+    def _get(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    from concurrent.futures import ThreadPoolExecutor
+                    self._executor = ThreadPoolExecutor(self.workers)
+
+        return self._executor
+
+    def submit(self, fn: Callable, *args, **kwargs):
+        return self._get().submit(fn, *args, **kwargs)
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+
+        if executor is not None:
+            executor.shutdown(wait=wait)
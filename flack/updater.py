@@ -0,0 +1,137 @@
+# coding=utf-8
+import logging
+import time
+from functools import wraps
+from threading import Lock
+from typing import Callable
+
+__all__ = ["MessageUpdater", "closing_updater", ]
+
+logger = logging.getLogger(__name__)
+
+
+class MessageUpdater:
+    """ Debounced, in-place updates of the message behind a response_url
+
+    Only the latest update is sent, at most once per `interval` seconds.
+    Slack accepts a limited number of uses of a response_url, so at most
+    `max_updates` are sent, the last `reserved` of which are kept for
+    `close` and `finish`.
+    """
+
+    def __init__(
+        self,
+        build: Callable[[object], dict],
+        send: Callable[[dict], None],
+        scheduler,
+        interval: float = 1.0,
+        max_updates: int = 5,
+        reserved: int = 1,
+    ) -> None:
+        self.build = build
+        self.send = send
+        self.scheduler = scheduler
+        self.interval = interval
+        self.max_updates = max_updates
+        self.reserved = reserved
+
+        self.sent = 0
+        self.last_sent = 0
+
+        self._pending = None
+        self._version = 0
+        self._sent_version = 0
+        self._job = None
+
+        self._lock = Lock()
+        self._send_lock = Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _set(self, body: dict) -> None:
+        with self._lock:
+            self._pending = body
+            self._version += 1
+
+            if self._job is not None or \
+                    self.sent >= self.max_updates - self.reserved:
+                # Already on its way, or saved for the final update
+                return
+
+            due = max(time.time(), self.last_sent + self.interval)
+            self._job = self.scheduler.schedule(due, None, self._flush)
+
+    def update(self, message) -> None:
+        """ Replace the original message """
+
+        body = self.build(message)
+        body["replace_original"] = True
+        self._set(body)
+
+    def delete(self) -> None:
+        """ Delete the original message """
+        self._set({"delete_original": True})
+
+    def _flush(self) -> None:
+        with self._lock:
+            body, version = self._pending, self._version
+            self._pending, self._job = None, None
+
+        if body is None:
+            return
+
+        with self._send_lock:
+            # An update flushed later may have overtaken this one
+            if version <= self._sent_version:
+                return
+
+            if self.sent >= self.max_updates:
+                logger.warning("Dropping update, response url is used up")
+                return
+
+            self._sent_version = version
+            self.sent += 1
+            self.last_sent = time.time()
+
+            self.send(body)
+
+    def close(self) -> None:
+        """ Send the latest update right away """
+
+        with self._lock:
+            if self._job is not None:
+                self.scheduler.cancel(self._job)
+                self._job = None
+
+        try:
+            self._flush()
+
+        except Exception as e:
+            # Never replace the outcome of the handler
+            logger.exception("Caught: %r, sending the final update.", e)
+
+    def finish(self, message) -> None:
+        """ Replace the original message with a late result, once closed """
+
+        if message is not None:
+            self.update(message)
+
+        self.close()
+
+
+def closing_updater(fn: Callable) -> Callable:
+    """ Closes the updater passed to a handler, once the handler returns """
+
+    @wraps(fn)
+    def inner(*args, **kwargs):
+        try:
+            return fn(*args, **kwargs)
+
+        finally:
+            kwargs["updater"].close()
+
+    return inner
@@ -28,7 +28,11 @@ setup(
     url=__url__,
     download_url="{}/archive/{}.tar.gz".format(__url__, __version__),
     install_requires=[
-        "flask",
+        "flask>=3.1",
         "requests"
-    ]
+    ],
+    extras_require={
+        "socket": ["websocket-client"],
+        "fast": ["orjson"]
+    }
 )
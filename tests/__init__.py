@@ -96,3 +96,30 @@ BLOCK_ACTION_DATA = {
         "response_url": "https://hooks.slack.com/actions/ABAB/CDCD/EFEF"
     })
 }
+
+# https://api.slack.com/apis/connections/events-api
+EVENT_DATA = {
+    "token": "test-token",
+    "team_id": "T0001",
+    "api_app_id": "ABC123",
+
+    "event": {
+        "type": "message",
+        "channel": "C2147483705",
+        "user": "U2147483697",
+        "text": "Testing",
+        "ts": "1355517523.000005",
+        "event_ts": "1355517523.000005",
+        "channel_type": "channel"
+    },
+
+    "type": "event_callback",
+    "event_id": "Ev08MFMKH6",
+    "event_time": 1355517523
+}
+
+URL_VERIFICATION_DATA = {
+    "token": "test-token",
+    "challenge": "3eZbrw1aBm2rZgRNFdxV2595E9CY3gmdALWMmHkvFXO7tYXAYM8P",
+    "type": "url_verification"
+}
@@ -1,11 +1,19 @@
 # coding=utf-8
+import time
+import hmac
+import hashlib
+from io import BytesIO
+from urllib.parse import urlencode
 from unittest.mock import Mock
 from pytest import fixture
 
 from flask import Flask
 from flack import Flack
 
-from . import WEBHOOK_DATA, COMMAND_DATA, BLOCK_ACTION_DATA
+from . import (
+    WEBHOOK_DATA, COMMAND_DATA, BLOCK_ACTION_DATA,
+    EVENT_DATA, URL_VERIFICATION_DATA
+)
 
 
 @fixture
@@ -130,3 +138,194 @@ def test_action(flack):
     assert kwargs["channel"].id == "C2147483705"
     assert kwargs["channel"].name == "test"
     assert kwargs["channel"].team == "T0001"
+
+
+def test_event(flack):
+    mock_handler = Mock()
+
+    @flack.event("message")
+    def foo(*args, **kwargs):
+        return mock_handler(*args, **kwargs)
+
+    client = flack.app.test_client()
+    response = client.post('/test/events', json=URL_VERIFICATION_DATA)
+    assert response.status_code == 200
+    assert response.json == {"challenge": URL_VERIFICATION_DATA["challenge"]}
+
+    response = client.post('/test/events', json=EVENT_DATA)
+    assert response.status_code == 200
+    assert response.data == b""
+
+    flack.event_queue.join()
+
+    # Flack shouldn't hadd positional args
+    args, kwargs = mock_handler.call_args
+    assert args == ()
+
+    # See EVENT_DATA
+    assert set(kwargs.keys()) == {"event", "team"}
+
+    assert kwargs["event"]["text"] == "Testing"
+    assert kwargs["team"] == "T0001"
+
+    # Retries of an already acknowledged event are ignored
+    client.post('/test/events', json=EVENT_DATA)
+    flack.event_queue.join()
+    assert mock_handler.call_count == 1
+
+    response = client.post('/test/events', json=dict(EVENT_DATA, token="x"))
+    assert response.status_code == 403
+
+
+def test_signature():
+    mock_handler = Mock()
+    mock_handler.return_value = "foo"
+
+    app = Flask(__name__)
+    app.config["FLACK_SIGNING_SECRET"] = "secret"
+
+    flack = Flack(app, config={"FLACK_URL_PREFIX": "/test"})
+
+    # Limits the body size of a second bot on the same app
+    small = Flack(app, name="small", config={
+        "FLACK_URL_PREFIX": "/small",
+        "FLACK_MAX_CONTENT_LENGTH": 16
+    })
+
+    @flack.command("/test")
+    @small.command("/test")
+    def foo(*args, **kwargs):
+        return mock_handler(*args, **kwargs)
+
+    def post(body, timestamp=None, secret="secret", prefix="/test"):
+        timestamp = str(timestamp or int(time.time()))
+        signature = "v0=" + hmac.new(
+            secret.encode(), "v0:{}:{}".format(timestamp, body).encode(),
+            hashlib.sha256).hexdigest()
+
+        return client.post(
+            prefix + '/command', data=body,
+            content_type="application/x-www-form-urlencoded",
+            headers={
+                "X-Slack-Request-Timestamp": timestamp,
+                "X-Slack-Signature": signature
+            })
+
+    client = flack.app.test_client()
+    body = urlencode(dict(COMMAND_DATA, token=""))
+
+    response = post(body)
+    assert response.status_code == 200
+    assert mock_handler.call_count == 1
+
+    # Wrong secret
+    response = post(body, secret="other")
+    assert response.status_code == 403
+
+    # Replayed request
+    response = post(body, timestamp=int(time.time()) - 600)
+    assert response.status_code == 403
+
+    # Unsigned request
+    response = client.post('/test/command', data=COMMAND_DATA)
+    assert response.status_code == 403
+
+    response = post(body, prefix="/small")
+    assert response.status_code == 413
+
+    # Chunked, without a Content-Length
+    timestamp = str(int(time.time()))
+    response = client.post(
+        '/small/command', input_stream=BytesIO(body.encode()),
+        content_type="application/x-www-form-urlencoded",
+        environ_overrides={"wsgi.input_terminated": True},
+        headers={
+            "Transfer-Encoding": "chunked",
+            "X-Slack-Request-Timestamp": timestamp,
+            "X-Slack-Signature": "v0=" + hmac.new(
+                b"secret", "v0:{}:{}".format(timestamp, body).encode(),
+                hashlib.sha256).hexdigest()
+        })
+    assert response.status_code == 413
+
+    assert mock_handler.call_count == 1
+
+
+def test_instances():
+    app = Flask(__name__)
+    app.config["FLACK_TOKEN"] = "test-token"
+
+    first = Flack(app)
+    second = Flack(app, name="second", config={
+        "FLACK_URL_PREFIX": "/second",
+        "FLACK_DEFAULT_NAME": "other"
+    })
+
+    first.trigger("!test")(Mock(return_value="first"))
+    second.trigger("!test")(Mock(return_value="second"))
+
+    assert first.triggers is not second.triggers
+
+    client = app.test_client()
+    response = client.post('/flack/webhook', data=WEBHOOK_DATA)
+    assert response.json["text"] == "first"
+    assert response.json["username"] == "flack"
+
+    response = client.post('/second/webhook', data=WEBHOOK_DATA)
+    assert response.json["text"] == "second"
+    assert response.json["username"] == "other"
+
+
+def test_middleware(flack):
+    mock_handler = Mock(return_value="foo")
+    flack.command("/test")(mock_handler)
+
+    calls = []
+
+    @flack.before_dispatch
+    def before(kind, data):
+        calls.append(kind)
+        if data["text"] == "blocked":
+            return "nope"
+
+    @flack.after_dispatch
+    def after(kind, data, message):
+        return message.upper()
+
+    client = flack.app.test_client()
+    response = client.post('/test/command', data=COMMAND_DATA)
+    assert response.json["text"] == "FOO"
+    assert calls == ["command"]
+
+    response = client.post('/test/command',
+                           data=dict(COMMAND_DATA, text="blocked"))
+    assert response.json["text"] == "NOPE"
+    assert mock_handler.call_count == 1
+
+    mock_handler.side_effect = ValueError("bad")
+    response = client.post('/test/command', data=COMMAND_DATA)
+    assert response.status_code == 500
+
+    @flack.dispatch_error
+    def error(kind, data, exception):
+        return "Sorry: {}".format(exception)
+
+    response = client.post('/test/command', data=COMMAND_DATA)
+    assert response.status_code == 200
+    assert response.json["text"] == "Sorry: bad"
+
+
+def test_malformed(flack):
+    flack.action("test")(Mock())
+
+    client = flack.app.test_client()
+    response = client.post('/test/action', data={"payload": "{not json"})
+    assert response.status_code == 400
+
+    response = client.post('/test/events', data="{not json",
+                           content_type="application/json")
+    assert response.status_code == 400
+
+    response = client.post('/test/events', data="null",
+                           content_type="application/json")
+    assert response.status_code == 400
@@ -0,0 +1,118 @@
+# coding=utf-8
+import time
+from threading import Event
+from unittest.mock import patch, Mock
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Flask, request
+
+from flack import Flack
+from flack.budget import TimeBudget
+
+from . import COMMAND_DATA
+
+
+def test_budget():
+    app = Flask(__name__)
+    app.config["FLACK_TOKEN"] = "test-token"
+    flack = Flack(app, config={"FLACK_DEFERRED_MESSAGE": "Hold on"})
+
+    @flack.command("/slow", budget=0.05)
+    def slow(text, **kwargs):
+        # Handlers keep their request context
+        assert request.form["command"] == "/slow"
+
+        if text == "fast":
+            return "quick"
+
+        time.sleep(0.2)
+        return "done"
+
+    delivered = Event()
+    client = flack.app.test_client()
+
+    with patch("flack._send_message",
+               side_effect=lambda *args: delivered.set()) as mock_send:
+        response = client.post('/flack/command', data=dict(
+            COMMAND_DATA, command="/slow", text="fast"))
+        assert response.json["text"] == "quick"
+        mock_send.assert_not_called()
+
+        response = client.post('/flack/command', data=dict(
+            COMMAND_DATA, command="/slow"))
+        assert response.status_code == 200
+        assert response.json["response_type"] == "ephemeral"
+        assert response.json["text"] == "Hold on"
+
+        assert delivered.wait(1)
+        url, message = mock_send.call_args[0]
+        assert url == COMMAND_DATA["response_url"]
+        assert message["text"] == "done"
+
+
+def test_circuit_breaker():
+    app = Flask(__name__)
+    executor = ThreadPoolExecutor(1)
+    delivered = []
+
+    budget = TimeBudget(lambda value: value, budget=1, window=4)
+    assert not budget.tripped
+
+    with app.app_context():
+        assert budget.run(executor, delivered.append, Mock(), value="a") == "a"
+
+        # Recent runs have been slow
+        budget.latencies.extend([2, 2])
+        assert budget.tripped
+
+        response = budget.run(executor, delivered.append, Mock(), value="b")
+        assert response.feedback == "Working on it…"
+
+        executor.shutdown(wait=True)
+        assert delivered == ["b"]
+
+    # Fast runs close the breaker again
+    budget.latencies.extend([0, 0, 0])
+    assert not budget.tripped
+
+
+def test_deferred_error():
+    app = Flask(__name__)
+    app.config["FLACK_TOKEN"] = "test-token"
+    flack = Flack(app)
+
+    @flack.command("/slow", budget=0.01)
+    def slow(text, **kwargs):
+        time.sleep(0.05)
+        raise ValueError(text)
+
+    errors = []
+
+    @flack.dispatch_error
+    def apologize(kind, data, exception):
+        errors.append((kind, exception))
+        if str(exception) == "hooked":
+            return "Sorry!"
+
+    delivered = Event()
+    client = flack.app.test_client()
+
+    with patch("flack._send_message",
+               side_effect=lambda *args: delivered.set()) as mock_send:
+        response = client.post('/flack/command', data=dict(
+            COMMAND_DATA, command="/slow", text="hooked"))
+        assert response.json["text"] == "Working on it…"
+
+        # Late errors go through the error hooks
+        assert delivered.wait(1)
+        assert errors[0][0] == "command"
+        assert mock_send.call_args[0][1]["text"] == "Sorry!"
+
+        delivered.clear()
+        client.post('/flack/command', data=dict(
+            COMMAND_DATA, command="/slow", text="unhandled"))
+
+        # Or replace the placeholder with a generic apology
+        assert delivered.wait(1)
+        assert mock_send.call_args[0][1]["text"] == \
+            app.config["FLACK_DEFERRED_ERROR_MESSAGE"]
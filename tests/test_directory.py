@@ -0,0 +1,140 @@
+# coding=utf-8
+from unittest.mock import patch, Mock
+
+import pytest
+from flask import Flask
+
+from flack import Flack, CALLER, CHANNEL
+from flack.directory import Directory, LRUCache, RateLimited
+from flack.exceptions import ConfigError
+
+
+def api_response(**data):
+    response = Mock()
+    response.json.return_value = dict({"ok": True}, **data)
+    return response
+
+
+def test_lru_cache():
+    cache = LRUCache(max_size=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == (1, True)
+
+    # "b" is now the least recently used
+    cache.set("c", 3)
+    assert "b" not in cache
+    assert len(cache) == 2
+
+    with pytest.raises(KeyError):
+        cache.get("b")
+
+    cache.ttl = 0
+    assert cache.get("a") == (1, False)
+
+
+@patch("flack.directory.post")
+def test_prefetch(mock_post):
+    mock_post.side_effect = [
+        api_response(members=[{"id": "U1"}],
+                     response_metadata={"next_cursor": "abc"}),
+        api_response(members=[{"id": "U2"}]),
+        api_response(channels=[{"id": "C1"}]),
+    ]
+
+    directory = Directory(lambda team: "xoxb-" + team)
+    directory.prefetch("T1")
+
+    assert mock_post.call_count == 3
+    assert mock_post.call_args_list[1][1]["data"]["cursor"] == "abc"
+    assert mock_post.call_args[1]["headers"] == {
+        "Authorization": "Bearer xoxb-T1"}
+
+    # Served from cache, without any further calls
+    assert directory.user("T1", "U2") == {"id": "U2"}
+    assert directory.channel("T1", "C1") == {"id": "C1"}
+    assert mock_post.call_count == 3
+
+
+@patch("flack.directory.post")
+def test_lookup(mock_post):
+    directory = Directory(lambda team: "xoxb")
+    directory._prefetched.add("T1")
+
+    mock_post.return_value = api_response(user={"id": "U1", "tz": "UTC"})
+    assert directory.user("T1", "U1")["tz"] == "UTC"
+    assert mock_post.call_args[1]["data"] == {"user": "U1"}
+
+    # Stale entries are served while refreshing in the background
+    directory.users.ttl = 0
+    mock_post.return_value = api_response(user={"id": "U1", "tz": "CET"})
+    assert directory.user("T1", "U1")["tz"] == "UTC"
+
+    directory._executor.shutdown(wait=True)
+    assert directory.users.get(("T1", "U1"))[0]["tz"] == "CET"
+
+    mock_post.return_value = api_response(ok=False, error="not_found")
+    assert directory.channel("T1", "C404") is None
+
+
+@patch("flack.directory.post")
+def test_enriched_view(mock_post):
+    app = Flask(__name__)
+    flack = Flack(app)
+
+    with app.app_context():
+        with pytest.raises(ConfigError):
+            CALLER("U1", "Steve", "T1").info
+
+    @flack.token_loader
+    def tokens(team):
+        return "xoxb"
+
+    flack.directory.users.set(("T1", "U1"), {"id": "U1", "tz": "UTC"})
+    flack.directory.channels.set(("T1", "C1"), {"id": "C1", "is_member": True})
+    flack.directory._prefetched.add("T1")
+
+    with app.app_context():
+        assert CALLER("U1", "Steve", "T1").info["tz"] == "UTC"
+        assert CHANNEL("C1", "test", "T1").info["is_member"]
+
+    mock_post.assert_not_called()
+
+
+@patch("flack.directory.post")
+def test_prefetch_backoff(mock_post):
+    limited = Mock(status_code=429, headers={"Retry-After": "30"})
+    mock_post.return_value = limited
+
+    directory = Directory(lambda team: "xoxb")
+    assert directory.user("T1", "U1") is None
+    directory._executor.shutdown(wait=True)
+
+    # One prefetch attempt, nothing more while rate limited
+    calls = mock_post.call_count
+    assert calls <= 2
+    assert directory._prefetch_after["T1"] > 0
+    assert directory._limited_until["T1"] > 0
+
+    assert directory.user("T1", "U2") is None
+    directory._executor.shutdown(wait=True)
+    assert mock_post.call_count == calls
+
+    with pytest.raises(RateLimited):
+        directory._call("T1", "users.info", user="U1")
+
+
+@patch("flack.directory.post")
+def test_prefetch_failure(mock_post):
+    mock_post.return_value = api_response(ok=False, error="missing_scope")
+
+    directory = Directory(lambda team: "xoxb")
+    with pytest.raises(ValueError):
+        directory.prefetch("T1")
+
+    # Lookups fall back to users.info, without crawling again
+    mock_post.reset_mock()
+    directory.user("T1", "U1")
+    directory._executor.shutdown(wait=True)
+    assert mock_post.call_count == 1
+    assert mock_post.call_args[0][0].endswith("users.info")
@@ -0,0 +1,104 @@
+# coding=utf-8
+from threading import Event
+from unittest.mock import Mock
+
+from flack.events import EventQueue
+
+
+def payload(event_id, channel):
+    return {
+        "event_id": event_id,
+        "event": {"type": "message", "channel": channel}
+    }
+
+
+def test_ordering():
+    seen = []
+    queue = EventQueue(lambda data: seen.append(data["event_id"]), workers=4)
+
+    for i in range(100):
+        assert queue.put(payload(i, "C{}".format(i % 3)))
+
+    queue.join()
+    assert sorted(seen) == list(range(100))
+
+    for channel in range(3):
+        ordered = [i for i in seen if i % 3 == channel]
+        assert ordered == sorted(ordered)
+
+
+def test_batching():
+    started, release = Event(), Event()
+
+    def block(data):
+        started.set()
+        release.wait(1)
+
+    handler = Mock(side_effect=block)
+    queue = EventQueue(handler, workers=1, batch_size=5, max_size=2)
+
+    # The worker holds the first event, the queue holds two more
+    assert queue.put(payload("a", "C1"))
+    started.wait(1)
+    assert queue.put(payload("b", "C1"))
+    assert queue.put(payload("c", "C1"))
+    assert not queue.put(payload("d", "C1"))
+
+    release.set()
+    queue.join()
+    assert handler.call_count == 3
+
+
+def test_errors():
+    handler = Mock(side_effect=[ValueError("bad"), None])
+    queue = EventQueue(handler, workers=1)
+
+    queue.put(payload("a", "C1"))
+    queue.put(payload("b", "C1"))
+    queue.join()
+
+    assert handler.call_count == 2
+
+
+def test_full_retry():
+    started, release = Event(), Event()
+
+    def block(data):
+        started.set()
+        release.wait(1)
+
+    handler = Mock(side_effect=block)
+    queue = EventQueue(handler, workers=1, max_size=1)
+
+    assert queue.put(payload("a", "C1"))
+    started.wait(1)
+    assert queue.put(payload("b", "C1"))
+
+    # Rejected while full, and accepted again when Slack retries
+    assert not queue.put(payload("c", "C1"))
+    release.set()
+    queue.join()
+
+    assert queue.put(payload("c", "C1"))
+    queue.join()
+
+    assert [c[0][0]["event_id"] for c in handler.call_args_list] == \
+        ["a", "b", "c"]
+
+
+def test_channel_object():
+    handler = Mock()
+    queue = EventQueue(handler, workers=2)
+
+    # e.g. channel_created and channel_rename
+    event = {
+        "event_id": "Ev1",
+        "event": {
+            "type": "channel_created",
+            "channel": {"id": "C1", "name": "fun", "creator": "U1"}
+        }
+    }
+
+    assert queue.put(event)
+    queue.join()
+    handler.assert_called_once_with(event)
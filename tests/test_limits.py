@@ -0,0 +1,138 @@
+# coding=utf-8
+from threading import Event, Thread
+from unittest.mock import Mock, patch
+
+import pytest
+from flask import Flask
+
+from flack import Flack, CALLER, CHANNEL
+from flack.message import PrivateResponse
+from flack.limits import parse_limit, TokenBucket, admission
+
+from . import COMMAND_DATA
+
+
+STEVE = CALLER("U1", "Steve", "T1")
+BOB = CALLER("U2", "Bob", "T1")
+CHAN = CHANNEL("C1", "test", "T1")
+
+
+def test_parse_limit():
+    assert parse_limit("5/min per user") == (5, 60, "user")
+    assert parse_limit("100 / 10s") == (100, 10, "global")
+    assert parse_limit("1/day per channel") == (1, 86400, "channel")
+
+    with pytest.raises(AttributeError):
+        parse_limit("5 per user")
+
+    with pytest.raises(AttributeError):
+        parse_limit("5/fortnight")
+
+    with pytest.raises(AttributeError):
+        parse_limit("5/min per planet")
+
+
+@patch("flack.limits.time.monotonic")
+def test_token_bucket(mock_time):
+    mock_time.return_value = 0
+    bucket = TokenBucket(2, 60)
+
+    assert bucket.consume()
+    assert bucket.consume()
+    assert not bucket.consume()
+
+    mock_time.return_value = 30
+    assert bucket.consume()
+    assert not bucket.consume()
+
+
+def test_rate_limit():
+    app = Flask(__name__)
+    handler = Mock(return_value="ok")
+
+    def foo(**kwargs):
+        return handler(**kwargs)
+
+    limited = admission(foo, limit="2/min per user")
+
+    assert admission(foo) is foo
+
+    with app.app_context():
+        assert limited(user=STEVE, channel=CHAN) == "ok"
+        assert limited(user=STEVE, channel=CHAN) == "ok"
+
+        response = limited(user=STEVE, channel=CHAN)
+        assert isinstance(response, PrivateResponse)
+
+        # Other users have their own bucket
+        assert limited(user=BOB, channel=CHAN) == "ok"
+
+    assert handler.call_count == 3
+
+
+def test_bounded_keys():
+    app = Flask(__name__)
+
+    def foo(**kwargs):
+        pass
+
+    limited = admission(foo, limit="1/min per user", max_keys=1)
+
+    with app.app_context():
+        limited(user=STEVE)
+        limited(user=BOB)
+
+        # Steve was evicted, and starts over with a full bucket
+        assert not isinstance(limited(user=STEVE), PrivateResponse)
+
+
+def test_max_concurrent():
+    started, release = Event(), Event()
+
+    def slow(**kwargs):
+        started.set()
+        release.wait(1)
+
+    limited = admission(slow, max_concurrent=1, message=lambda: "busy")
+    thread = Thread(target=limited, kwargs={"user": STEVE})
+    thread.start()
+    started.wait(1)
+
+    assert limited(user=BOB) == PrivateResponse("busy")
+
+    release.set()
+    thread.join()
+
+    assert limited(user=BOB) is None
+
+
+def test_instance_message():
+    app = Flask(__name__)
+    app.config["FLACK_TOKEN"] = "test-token"
+    app.config["FLACK_LIMIT_MESSAGE"] = "app"
+
+    # Registered before init_app, the override is resolved later
+    flack = Flack(name="limited", config={"FLACK_LIMIT_MESSAGE": "instance"})
+
+    @flack.command("/once", limit="1/min")
+    def once(**kwargs):
+        return "ok"
+
+    flack.init_app(app)
+    client = app.test_client()
+
+    data = dict(COMMAND_DATA, command="/once")
+    assert client.post('/flack/command', data=data).json["text"] == "ok"
+    assert client.post('/flack/command',
+                       data=data).json["text"] == "instance"
+
+
+def test_trigger_scope():
+    flack = Flack()
+
+    # Triggers are not passed a channel
+    with pytest.raises(AttributeError):
+        flack.trigger("!spam", limit="1/min per channel")
+
+    flack.trigger("!spam", limit="1/min per user")(Mock())
+    assert "!spam" in flack.triggers
@@ -0,0 +1,10 @@
+# coding=utf-8
+import json
+
+from flack.payload import json_loads
+
+
+def test_json_loads():
+    raw = json.dumps({"a": [1, 2, {"b": None}]})
+    assert json_loads(raw) == {"a": [1, 2, {"b": None}]}
+    assert json_loads(raw.encode()) == {"a": [1, 2, {"b": None}]}
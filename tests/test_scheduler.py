@@ -0,0 +1,211 @@
+# coding=utf-8
+import time
+from threading import Event
+from unittest.mock import patch, Mock
+
+import pytest
+from flask import Flask
+
+from flack import Flack
+from flack.message import DelayedResponse
+from flack.scheduler import Scheduler
+
+from . import COMMAND_DATA
+
+
+class Recorder:
+    """ Collects delivered jobs, signalling once `count` have arrived """
+
+    def __init__(self, count=1):
+        self.count = count
+        self.calls = []
+        self.done = Event()
+
+    def __call__(self, url, message):
+        self.calls.append((url, message))
+        if len(self.calls) >= self.count:
+            self.done.set()
+
+
+def test_ordering():
+    deliver = Recorder(3)
+    scheduler = Scheduler(deliver, workers=1)
+    scheduler.start()
+
+    now = time.time()
+    scheduler.schedule(now + 0.06, "url", {"text": "third"})
+    scheduler.schedule(now + 0.02, "url", {"text": "first"})
+    scheduler.schedule(now + 0.04, "url", {"text": "second"})
+
+    cancelled = scheduler.schedule(now + 0.03, "url", {"text": "never"})
+    assert scheduler.cancel(cancelled)
+    assert not scheduler.cancel(cancelled)
+
+    assert deliver.done.wait(1)
+    assert [m["text"] for _, m in deliver.calls] == [
+        "first", "second", "third"]
+    assert len(scheduler) == 0
+
+
+def test_recurring():
+    deliver = Recorder(3)
+    scheduler = Scheduler(deliver)
+    scheduler.start()
+
+    job = scheduler.schedule(time.time(), "url", {"text": "tick"},
+                             interval=0.01)
+    assert deliver.done.wait(1)
+
+    scheduler.cancel(job)
+    assert len(scheduler) == 0
+
+
+def test_capacity():
+    scheduler = Scheduler(Mock())
+    due = time.time() + 3600
+
+    started = time.monotonic()
+    for i in range(100000):
+        scheduler.schedule(due + 100000 - i, "url", {"text": i})
+
+    assert len(scheduler) == 100000
+    assert time.monotonic() - started < 10
+
+    # The earliest job is always on top of the heap
+    assert scheduler._heap[0][0] == due + 1
+
+
+def test_start():
+    deliver = Recorder()
+    scheduler = Scheduler(deliver)
+
+    # Nothing runs before the scheduler is started, ie. in a forked worker
+    scheduler.schedule(time.time(), "url", {"text": "now"})
+    assert not deliver.done.wait(0.05)
+    assert scheduler._thread is None
+
+    scheduler.start()
+    assert deliver.done.wait(1)
+
+
+def test_persistence(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    due = time.time() + 3600
+
+    # The database is only opened once started
+    scheduler = Scheduler(Mock(), path=path)
+    scheduler.schedule(due, "url", {"text": "later"})
+    assert scheduler._db is None
+
+    scheduler.start()
+    scheduler.schedule(due, "url", {"text": "daily"}, interval=86400)
+    done = scheduler.schedule(due, "url", {"text": "cancelled"})
+    scheduler.cancel(done)
+
+    # Callables can't be persisted
+    scheduler.schedule(due, "url", lambda: "digest")
+
+    restored = Scheduler(Mock(), path=path)
+    restored.start()
+    assert sorted(job.message["text"] for job in restored._jobs.values()) \
+        == ["daily", "later"]
+
+
+def test_claim(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    deliver = Recorder()
+
+    # Two worker processes sharing a database
+    workers = [Scheduler(deliver, path=path) for _ in range(2)]
+    due = time.time() + 0.05
+
+    for scheduler in workers:
+        scheduler.schedule(due, "url", lambda: "digest", job_id="digest")
+        scheduler.schedule(due, "url", lambda: "tick", job_id="tick",
+                           interval=0.1)
+
+    workers[0].schedule(due, "url", {"text": "once"})
+
+    for scheduler in workers:
+        scheduler.start()
+
+    time.sleep(0.3)
+    for scheduler in workers:
+        scheduler.cancel("tick")
+
+    # Every run was delivered by only one of them
+    messages = [m if isinstance(m, dict) else m() for _, m in deliver.calls]
+    assert messages.count("digest") == 1
+    assert messages.count({"text": "once"}) == 1
+    assert 1 <= messages.count("tick") <= 3
+
+
+@patch("flack._send_message")
+def test_delayed_response(mock_send):
+    app = Flask(__name__)
+    app.config["FLACK_TOKEN"] = "test-token"
+    flack = Flack(app)
+
+    sent = Event()
+    mock_send.side_effect = lambda *args, **kwargs: sent.set()
+
+    @flack.command("/test")
+    def remind(**kwargs):
+        return DelayedResponse("Will do!", "Reminder!", 0.01)
+
+    client = app.test_client()
+    response = client.post('/flack/command', data=COMMAND_DATA)
+    assert response.json["text"] == "Will do!"
+    assert response.json["response_type"] == "ephemeral"
+
+    assert sent.wait(1)
+    url, message = mock_send.call_args[0]
+    assert url == COMMAND_DATA["response_url"]
+    assert message["text"] == "Reminder!"
+
+
+@patch("flack._send_message")
+def test_schedule(mock_send):
+    app = Flask(__name__)
+    flack = Flack(app)
+
+    sent = Event()
+    mock_send.side_effect = lambda *args, **kwargs: sent.set()
+
+    @flack.schedule("https://hooks.slack.com/services/T/B/X", every=3600,
+                    at=time.time())
+    def digest():
+        return "Good morning!"
+
+    @app.route("/health")
+    def health():
+        return "ok"
+
+    assert flack.scheduler._thread is None
+
+    # Started by the first request a worker serves, to any endpoint
+    app.test_client().get("/health")
+    assert sent.wait(1)
+    url, message = mock_send.call_args[0]
+    assert url == "https://hooks.slack.com/services/T/B/X"
+    assert message["text"] == "Good morning!"
+
+    # Queued up for the next run
+    assert len(flack.scheduler) == 1
+
+
+def test_schedule_ids():
+    app = Flask(__name__)
+    flack = Flack(app)
+
+    @flack.schedule("https://hooks.slack.com/services/T/B/X", every=3600)
+    @flack.schedule("https://hooks.slack.com/services/T/B/Y", every=3600)
+    @flack.schedule("https://hooks.slack.com/services/T/B/Y", every=60)
+    def digest():
+        return "Good morning!"
+
+    assert len(flack.scheduler) == 3
+
+    with pytest.raises(AttributeError):
+        flack.schedule("https://hooks.slack.com/services/T/B/X",
+                       every=3600)(digest)
@@ -0,0 +1,188 @@
+# coding=utf-8
+import json
+from unittest.mock import patch, Mock
+
+import pytest
+from pytest import fixture
+from flask import Flask
+
+from flack import Flack
+from flack.socket_mode import SocketModeRunner
+from flack.exceptions import ConfigError
+
+from . import COMMAND_DATA, BLOCK_ACTION_DATA, EVENT_DATA
+
+
+class FakeConnection:
+    """ Stand-in for a WebSocket connection, replays a list of frames """
+
+    def __init__(self, runner, frames):
+        self.runner = runner
+        self.frames = [json.dumps(frame) for frame in frames]
+        self.sent = []
+
+    def recv(self):
+        if not self.frames:
+            self.runner.running = False
+            return ""
+
+        return self.frames.pop(0)
+
+    def send(self, data):
+        self.sent.append(json.loads(data))
+
+    def close(self):
+        pass
+
+
+@fixture
+def flack():
+    app = Flask(__name__)
+    app.config["TESTING"] = True
+    app.config["FLACK_APP_TOKEN"] = "xapp-test"
+
+    return Flack(app)
+
+
+def run(runner, frames):
+    connection = FakeConnection(runner, frames)
+
+    with patch.object(runner, "_open_url", return_value="wss://test"), \
+            patch.object(runner, "_connect", return_value=connection):
+        runner.run()
+
+    runner.stop()
+    return connection
+
+
+def test_config(flack):
+    flack.config["FLACK_APP_TOKEN"] = ""
+    with pytest.raises(ConfigError):
+        SocketModeRunner(flack)
+
+    runner = SocketModeRunner(flack, app_token="xapp-test")
+    assert runner.app_token == "xapp-test"
+
+
+@patch("flack.socket_mode.post")
+def test_open_url(mock_post, flack):
+    mock_post.return_value.json.return_value = {"ok": True, "url": "wss://x"}
+
+    runner = SocketModeRunner(flack)
+    assert runner._open_url() == "wss://x"
+    assert mock_post.call_args[1]["headers"] == {
+        "Authorization": "Bearer xapp-test"}
+
+    mock_post.return_value.json.return_value = {"ok": False}
+    with pytest.raises(ConfigError):
+        runner._open_url()
+
+
+@patch("flack.socket_mode._send_message")
+def test_envelopes(mock_send, flack):
+    mock_command = Mock(return_value="foo")
+    mock_action = Mock(return_value=None)
+    mock_event = Mock()
+
+    flack.command("/test")(mock_command)
+    flack.action("test")(mock_action)
+    flack.event("message")(mock_event)
+
+    runner = SocketModeRunner(flack, workers=2)
+    connection = run(runner, [
+        {"type": "hello"},
+        {"type": "slash_commands", "envelope_id": "1",
+         "payload": COMMAND_DATA},
+        {"type": "interactive", "envelope_id": "2",
+         "payload": json.loads(BLOCK_ACTION_DATA["payload"])},
+        {"type": "events_api", "envelope_id": "3",
+         "payload": EVENT_DATA},
+    ])
+
+    assert connection.sent == [
+        {"envelope_id": "1"},
+        {"envelope_id": "2"},
+        {"envelope_id": "3"}
+    ]
+
+    args, kwargs = mock_command.call_args
+    assert kwargs["text"] == "Testing"
+    assert kwargs["channel"].id == "C2147483705"
+
+    mock_send.assert_called_once()
+    url, response = mock_send.call_args[0]
+    assert url == COMMAND_DATA["response_url"]
+    assert response["text"] == "foo"
+
+    args, kwargs = mock_action.call_args
+    assert kwargs["value"] == "Testing"
+
+    flack.event_queue.join()
+    args, kwargs = mock_event.call_args
+    assert kwargs["event"]["text"] == "Testing"
+
+
+def test_queue_full(flack):
+    flack.event("message")(Mock())
+    runner = SocketModeRunner(flack)
+
+    with patch.object(flack.event_queue, "put", return_value=False):
+        connection = run(runner, [
+            {"type": "events_api", "envelope_id": "1",
+             "payload": EVENT_DATA},
+        ])
+
+    # Left unacknowledged, for Slack to redeliver
+    assert connection.sent == []
+
+
+@patch("flack.socket_mode._send_message")
+def test_hooks(mock_send, flack):
+    mock_command = Mock(return_value="foo")
+    flack.command("/test")(mock_command)
+    flack.command("/fail")(Mock(side_effect=ValueError))
+
+    kinds = []
+
+    @flack.before_dispatch
+    def before(kind, data):
+        kinds.append(kind)
+        if data["text"] == "blocked":
+            return "nope"
+
+    @flack.after_dispatch
+    def after(kind, data, message):
+        return message.upper()
+
+    @flack.dispatch_error
+    def error(kind, data, exception):
+        return "oops"
+
+    runner = SocketModeRunner(flack, workers=1)
+    run(runner, [
+        {"type": "slash_commands", "envelope_id": "1",
+         "payload": COMMAND_DATA},
+        {"type": "slash_commands", "envelope_id": "2",
+         "payload": dict(COMMAND_DATA, text="blocked")},
+        {"type": "slash_commands", "envelope_id": "3",
+         "payload": dict(COMMAND_DATA, command="/fail")},
+    ])
+
+    assert kinds == ["command"] * 3
+    mock_command.assert_called_once()
+    assert [call[0][1]["text"] for call in mock_send.call_args_list] == [
+        "FOO", "NOPE", "oops"]
+
+
+def test_reconnect(flack):
+    runner = SocketModeRunner(flack)
+    connections = [
+        FakeConnection(runner, [{"type": "disconnect", "reason": "refresh"}]),
+        FakeConnection(runner, []),
+    ]
+
+    with patch.object(runner, "_open_url", return_value="wss://test"), \
+            patch.object(runner, "_connect", side_effect=connections) as mock:
+        runner.run()
+
+    assert mock.call_count == 2
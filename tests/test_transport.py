@@ -0,0 +1,85 @@
+# coding=utf-8
+import os
+import sys
+import subprocess
+from unittest.mock import patch
+
+import pytest
+
+from flack.transport import LazyExecutor, _run_fork_hooks
+
+
+def import_time(module: str) -> dict:
+    """ Cumulative import time in µs per module, from `python -X importtime` """
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import " + module],
+        stderr=subprocess.PIPE, universal_newlines=True, check=True)
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+
+    return times
+
+
+@pytest.mark.parametrize("module", ["flack", "flack.oauth"])
+def test_import_time(module):
+    times = import_time(module)
+    assert module in times
+
+    # Outbound transport and thread pools are only loaded on first use
+    assert "requests" not in times
+    assert "concurrent.futures.thread" not in times
+
+
+def test_lazy_executor():
+    executor = LazyExecutor(1)
+    assert executor._executor is None
+
+    assert executor.submit(sum, [1, 2]).result() == 3
+    assert executor._executor is not None
+
+    # A forked child starts over, without the parents threads
+    _run_fork_hooks()
+    assert executor._executor is None
+
+    assert executor.submit(sum, [3, 4]).result() == 7
+    executor.shutdown()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork")
+def test_fork():
+    executor = LazyExecutor(1)
+    executor.submit(sum, [1]).result()
+
+    pid = os.fork()
+    if pid == 0:
+        try:
+            ok = executor._executor is None and \
+                executor.submit(sum, [1, 2]).result(timeout=5) == 3
+            os._exit(0 if ok else 1)
+
+        finally:
+            os._exit(1)
+
+    _, status = os.waitpid(pid, 0)
+    assert os.WEXITSTATUS(status) == 0
+    executor.shutdown()
+
+
+@patch("requests.Session")
+def test_post(mock_session):
+    from flack import transport
+
+    with patch.object(transport, "_session", None):
+        transport.post("https://example.com", json={})
+        transport.post("https://example.com", json={})
+
+    # One pooled session for every request
+    mock_session.assert_called_once()
+    assert mock_session.return_value.post.call_count == 2
@@ -0,0 +1,161 @@
+# coding=utf-8
+import time
+from threading import Event
+from unittest.mock import patch, Mock
+
+from flask import Flask
+
+from flack import Flack
+from flack.scheduler import Scheduler
+from flack.updater import MessageUpdater
+
+from . import BLOCK_ACTION_DATA
+
+
+def make_updater(**kwargs):
+    sent = []
+    scheduler = Scheduler(lambda url, job: job())
+    scheduler.start()
+
+    updater = MessageUpdater(lambda message: {"text": message}, sent.append,
+                             scheduler, **kwargs)
+    return updater, sent
+
+
+def test_debounce():
+    updater, sent = make_updater(interval=0.05, max_updates=5)
+
+    for i in range(300):
+        updater.update("{}%".format(i))
+        time.sleep(0.001)
+
+    updater.close()
+
+    # Latest wins, with at most one send per interval
+    assert 2 <= len(sent) <= 5
+    assert sent[-1] == {"text": "299%", "replace_original": True}
+
+    texts = [int(body["text"][:-1]) for body in sent]
+    assert texts == sorted(texts)
+
+
+def test_max_updates():
+    updater, sent = make_updater(interval=0, max_updates=2)
+
+    updater.update("a")
+    time.sleep(0.05)
+    updater.update("b")
+    time.sleep(0.05)
+
+    # The last use of the url is kept for the final state
+    assert [body["text"] for body in sent] == ["a"]
+
+    updater.delete()
+    updater.close()
+    assert sent[-1] == {"delete_original": True}
+
+    updater.update("c")
+    updater.close()
+    assert len(sent) == 2
+
+
+def test_close():
+    updater, sent = make_updater(interval=60)
+
+    with updater:
+        updater.update("a")
+        updater.update("b")
+
+    assert [body["text"] for body in sent] == ["b"]
+
+    # Nothing pending
+    updater.close()
+    assert len(sent) == 1
+
+
+def test_overtaken():
+    updater, sent = make_updater(interval=60)
+
+    updater.update("a")
+    stale = updater._pending, updater._version
+    updater.close()
+
+    # A flush overtaken by a later one is neither sent, nor counted
+    updater._pending, updater._version = stale
+    updater._flush()
+    assert len(sent) == 1
+    assert updater.sent == 1
+
+
+def test_close_error():
+    send = Mock(side_effect=ConnectionError)
+    updater = MessageUpdater(lambda message: {"text": message}, send,
+                             Scheduler(Mock()), interval=60)
+
+    # Raised from the final flush, but never from close
+    updater.update("a")
+    updater.close()
+    send.assert_called_once()
+
+
+@patch("flack._send_message")
+def test_action_updates(mock_send):
+    app = Flask(__name__)
+    app.config["FLACK_TOKEN"] = "test-token"
+    app.config["FLACK_UPDATE_INTERVAL"] = 60
+    flack = Flack(app)
+
+    handler = Mock(return_value=None)
+
+    @flack.action("test", updates=True)
+    def progress(updater, **kwargs):
+        for i in range(100):
+            updater.update("Working: {}%".format(i))
+
+        handler(**kwargs)
+        return "Done"
+
+    client = app.test_client()
+    response = client.post('/flack/action', data=BLOCK_ACTION_DATA)
+    assert response.json["text"] == "Done"
+
+    handler.assert_called_once()
+    assert "updater" not in handler.call_args[1]
+
+    # At most one debounced update, and the final state once done
+    url, body = mock_send.call_args[0]
+    assert url == "https://hooks.slack.com/actions/ABAB/CDCD/EFEF"
+    assert body["text"] == "Working: 99%"
+    assert body["replace_original"]
+    assert mock_send.call_count <= 2
+
+
+@patch("flack._send_message")
+def test_budget_updates(mock_send):
+    app = Flask(__name__)
+    app.config["FLACK_TOKEN"] = "test-token"
+    app.config["FLACK_UPDATE_INTERVAL"] = 0.01
+    flack = Flack(app)
+
+    done = Event()
+    mock_send.side_effect = lambda url, body, **kwargs: \
+        body.get("text") == "Import complete" and done.set()
+
+    @flack.action("test", updates=True, budget=0.01)
+    def run_import(updater, **kwargs):
+        for i in range(20):
+            updater.update("Importing: {}/20".format(i))
+            time.sleep(0.01)
+
+        return "Import complete"
+
+    client = app.test_client()
+    response = client.post('/flack/action', data=BLOCK_ACTION_DATA)
+    assert response.json["text"] == "Working on it…"
+
+    # The late result is the final update, within Slack's 5 uses of the url
+    assert done.wait(2)
+    bodies = [call[0][1] for call in mock_send.call_args_list]
+    assert len(bodies) <= 5
+    assert bodies[-1]["text"] == "Import complete"
+    assert bodies[-1]["replace_original"]